@@ -2,30 +2,124 @@
 Document Parser - Handles PDF/DOC requirement documents and prepares them for Llama synthesis
 """
 
+import io
 import os
+import re
+import sys
+import mmap
 import json
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
-import PyPDF2
-import pdfplumber
-from docx import Document
-from unstructured.partition.auto import partition
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-import tiktoken
+import hashlib
+import functools
+import threading
+from contextlib import contextmanager
+from collections import Counter, OrderedDict
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple
+from dataclasses import dataclass, field
 
-@dataclass
+# The parsing backends (PyPDF2, pdfplumber, python-docx, unstructured, langchain,
+# tiktoken) are imported where they are used: unstructured alone pulls in layout
+# models, and most callers only ever touch one of them.
+
+_ENCODING_NAME = "cl100k_base"
+_APPROX_CHARS_PER_TOKEN = 4
+# Same chunk granularity as the original 1000/200-character splitter, measured in tokens
+_CHUNK_SIZE = 1000 // _APPROX_CHARS_PER_TOKEN  # tokens
+_CHUNK_OVERLAP = 200 // _APPROX_CHARS_PER_TOKEN  # tokens
+_TEXT_SPLITTER_SEPARATORS = ["\n\n", "\n", ".", "!", "?", ",", " ", ""]
+
+@functools.lru_cache(maxsize=8)
+def _get_text_splitter(max_tokens: int):
+    """Return a shared token-aware splitter whose chunks never exceed max_tokens"""
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    chunk_size = min(_CHUNK_SIZE, max_tokens)
+    return RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+        encoding_name=_ENCODING_NAME,
+        disallowed_special=(),
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_size * _CHUNK_OVERLAP // _CHUNK_SIZE,
+        separators=_TEXT_SPLITTER_SEPARATORS
+    )
+
+# Files at least this large get a kernel readahead hint before parsing
+_READAHEAD_MIN_BYTES = 16 * 1024 * 1024
+
+def _prefetch_file(file_path: str) -> None:
+    """Ask the kernel to start reading a large file into the page cache ahead of the parser"""
+    if sys.platform != 'linux' or not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        if os.path.getsize(file_path) < _READAHEAD_MIN_BYTES:
+            return
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+    except OSError:
+        # Purely an optimization; the parsers will report real I/O errors
+        pass
+
+# Files up to this size are read into memory in one call; larger ones are memory-mapped
+_IN_MEMORY_MAX_BYTES = 50 * 1024 * 1024
+
+@contextmanager
+def _open_document_buffer(file_path: str):
+    """Yield a seekable binary buffer over the whole file for the parsing backends.
+    
+    The backends seek around and issue many small reads; serving those from memory
+    avoids a syscall each. Large files are mapped so the OS pager owns the pages.
+    """
+    with open(file_path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size <= _IN_MEMORY_MAX_BYTES:
+            yield io.BytesIO(file.read())
+        else:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+
+_MISSING = object()
+
+def _content_key(text: str) -> bytes:
+    """Short, stable digest of text used as a cache key"""
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+class _LRUCache:
+    """Small thread-safe LRU mapping shared by parser instances"""
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                return default
+            self._data.move_to_end(key)
+            return value
+    
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+@dataclass(slots=True, frozen=True)
 class RequirementTicket:
     """Structured representation of a requirement ticket"""
     page_number: int
     title: str
     description: str
-    features: List[str]
+    # Tuples, not lists: cached tickets are shared between parses (see _requirement_cache)
+    features: Tuple[str, ...]
     priority: str
-    acceptance_criteria: List[str]
+    acceptance_criteria: Tuple[str, ...]
     technical_notes: str
     raw_text: str
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ParsedDocument:
     """Complete parsed document structure"""
     filename: str
@@ -34,16 +128,48 @@ class ParsedDocument:
     summary: str
     metadata: Dict[str, Any]
 
+@dataclass
+class RequirementStats:
+    """Column-wise running totals over parsed requirements, filled while parsing"""
+    count: int = 0
+    priority_counts: Counter = field(default_factory=Counter)
+    feature_total: int = 0
+    
+    def add(self, requirement: RequirementTicket) -> None:
+        self.count += 1
+        self.priority_counts[requirement.priority] += 1
+        self.feature_total += len(requirement.features)
+
 class DocumentParser:
     """Handles parsing of requirement documents (PDF, DOCX)"""
     
-    def __init__(self):
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            separators=["\n\n", "\n", ".", "!", "?", ",", " ", ""]
-        )
-        self.tokenizer = tiktoken.get_encoding("cl100k_base")
+    # Precompiled patterns for the heuristic extractors
+    # Same marker set as the original startswith check: only 1. to 3. count as
+    # numbering, so lines like "99.9% uptime" stay whole
+    _BULLET_RE = re.compile(r'^(?:[•\-*]|[123]\.)')
+    _BULLET_STRIP_RE = re.compile(r'^[•\-*\d. ]+')
+    _SECTION_HEADER_RE = re.compile(r'priority:|description:|features:|acceptance criteria:|technical notes:', re.I)
+    # Every priority keyword in one zero-width alternation, so a single scan
+    # reports all (possibly overlapping) hits tagged with their category
+    _PRIORITY_KEYWORD_RE = re.compile(
+        r'(?=priority: (?P<field>high|medium|low)'
+        r'|(?P<high>high priority|critical|urgent)'
+        r'|(?P<medium>medium priority|normal)'
+        r'|(?P<low>low priority|nice to have))',
+        re.I
+    )
+    _SECTION_MARKERS = ('features:', 'acceptance criteria:', 'technical notes:', 'description:')
+    _SECTION_MARKER_RE = re.compile(r'features:|acceptance criteria:|technical notes:|description:', re.I)
+    _UNBULLETED_SKIP_RE = re.compile(r'(?:priority|description):', re.I)
+    _SECTION_KEYWORD_RE = re.compile(r'requirement|feature|story|ticket', re.I)
+    _NUMBERED_RE = re.compile(r'\d[^.]{0,3}\.')
+    _PDF_ARTIFACTS_TABLE = str.maketrans('', '', '\x0c')  # Form feed
+    
+    # Extracted requirements keyed by (content hash, page number), shared by all parsers
+    _requirement_cache = _LRUCache(maxsize=2048)
+    
+    # Chunk lists keyed by (content hash of the text being split, max_tokens)
+    _chunk_cache = _LRUCache(maxsize=1024)
     
     def parse_document(self, file_path: str) -> ParsedDocument:
         """Parse document and extract requirement tickets"""
@@ -60,93 +186,112 @@ class DocumentParser:
     def _parse_pdf(self, file_path: str) -> ParsedDocument:
         """Parse PDF document using multiple strategies"""
         
-        # Strategy 1: Use unstructured (Meta's library)
-        try:
-            return self._parse_with_unstructured(file_path)
-        except Exception as e:
-            print(f"Unstructured parsing failed: {e}")
+        _prefetch_file(file_path)
         
-        # Strategy 2: Fallback to pdfplumber
+        # Strategy 1: pdfplumber - plain per-page text extraction, no layout models
         try:
             return self._parse_with_pdfplumber(file_path)
         except Exception as e:
             print(f"Pdfplumber parsing failed: {e}")
         
-        # Strategy 3: Fallback to PyPDF2
-        return self._parse_with_pypdf2(file_path)
+        # Strategy 2: Fallback to PyPDF2
+        try:
+            return self._parse_with_pypdf2(file_path)
+        except Exception as e:
+            print(f"PyPDF2 parsing failed: {e}")
+        
+        # Strategy 3: Last resort, unstructured (Meta's library); slow to start
+        # since it loads layout-detection/OCR models
+        return self._parse_with_unstructured(file_path)
     
     def _parse_with_unstructured(self, file_path: str) -> ParsedDocument:
         """Parse using Meta's unstructured library"""
         
+        from unstructured.partition.auto import partition
+        
         elements = partition(filename=file_path)
         pages = self._group_elements_by_page(elements)
         
-        requirements = []
-        for page_num, page_elements in pages.items():
-            page_text = "\n".join([str(elem) for elem in page_elements])
-            requirement = self._extract_requirement_from_text(page_text, page_num)
-            if requirement:
-                requirements.append(requirement)
+        page_texts = (
+            (page_num, "\n".join([str(elem) for elem in page_elements]))
+            for page_num, page_elements in pages.items()
+        )
+        requirements, stats = self._collect_requirements(page_texts)
         
         return ParsedDocument(
             filename=os.path.basename(file_path),
             total_pages=len(pages),
             requirements=requirements,
-            summary=self._generate_document_summary(requirements),
+            summary=self._summary_from_stats(stats),
             metadata={"parser": "unstructured", "file_type": "pdf"}
         )
     
     def _parse_with_pdfplumber(self, file_path: str) -> ParsedDocument:
         """Parse using pdfplumber for better text extraction"""
         
-        requirements = []
-        with pdfplumber.open(file_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
-                text = page.extract_text()
-                if text and text.strip():
-                    requirement = self._extract_requirement_from_text(text, page_num)
-                    if requirement:
-                        requirements.append(requirement)
+        import pdfplumber
+        
+        with _open_document_buffer(file_path) as buffer, pdfplumber.open(buffer) as pdf:
+            total_pages = len(pdf.pages)
+            requirements, stats = self._collect_requirements(self._iter_pdf_page_texts(pdf))
         
         return ParsedDocument(
             filename=os.path.basename(file_path),
-            total_pages=len(pdf.pages),
+            total_pages=total_pages,
             requirements=requirements,
-            summary=self._generate_document_summary(requirements),
+            summary=self._summary_from_stats(stats),
             metadata={"parser": "pdfplumber", "file_type": "pdf"}
         )
     
     def _parse_with_pypdf2(self, file_path: str) -> ParsedDocument:
         """Fallback parsing with PyPDF2"""
         
-        requirements = []
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            
-            for page_num, page in enumerate(pdf_reader.pages, 1):
-                text = page.extract_text()
-                if text and text.strip():
-                    requirement = self._extract_requirement_from_text(text, page_num)
-                    if requirement:
-                        requirements.append(requirement)
+        import PyPDF2
+        
+        with _open_document_buffer(file_path) as buffer:
+            pdf_reader = PyPDF2.PdfReader(buffer)
+            requirements, stats = self._collect_requirements(self._iter_pdf_page_texts(pdf_reader))
         
         return ParsedDocument(
             filename=os.path.basename(file_path),
             total_pages=len(pdf_reader.pages),
             requirements=requirements,
-            summary=self._generate_document_summary(requirements),
+            summary=self._summary_from_stats(stats),
             metadata={"parser": "pypdf2", "file_type": "pdf"}
         )
     
     def _parse_docx(self, file_path: str) -> ParsedDocument:
         """Parse DOCX document"""
         
-        doc = Document(file_path)
-        requirements = []
+        from docx import Document
+        
+        with _open_document_buffer(file_path) as buffer:
+            doc = Document(buffer)
+        sections = list(self._iter_docx_sections(doc))
+        requirements, stats = self._collect_requirements(sections)
+        
+        return ParsedDocument(
+            filename=os.path.basename(file_path),
+            total_pages=len(sections) or 1,
+            requirements=requirements,
+            summary=self._summary_from_stats(stats),
+            metadata={"parser": "python-docx", "file_type": "docx"}
+        )
+    
+    def _iter_pdf_page_texts(self, pdf) -> Iterator[Tuple[int, str]]:
+        """Yield (page number, text) for each non-empty page of a pdfplumber/PyPDF2 document"""
+        for page_num, page in enumerate(pdf.pages, 1):
+            text = page.extract_text()
+            if text and text.strip():
+                yield page_num, text
+    
+    def _iter_docx_sections(self, doc) -> Iterator[Tuple[int, str]]:
+        """Yield (section number, text) for each section of a DOCX document"""
         
         # Group paragraphs by sections (assuming each section is a requirement)
         current_section = []
         section_num = 1
+        style_cache = {}
         
         for paragraph in doc.paragraphs:
             text = paragraph.text.strip()
@@ -154,12 +299,9 @@ class DocumentParser:
                 continue
             
             # Check if this is a new section (heuristic)
-            if self._is_new_section(paragraph):
+            if self._is_new_section(paragraph, style_cache):
                 if current_section:
-                    section_text = "\n".join(current_section)
-                    requirement = self._extract_requirement_from_text(section_text, section_num)
-                    if requirement:
-                        requirements.append(requirement)
+                    yield section_num, "\n".join(current_section)
                     section_num += 1
                     current_section = []
             
@@ -167,20 +309,36 @@ class DocumentParser:
         
         # Handle last section
         if current_section:
-            section_text = "\n".join(current_section)
-            requirement = self._extract_requirement_from_text(section_text, section_num)
+            yield section_num, "\n".join(current_section)
+    
+    def _collect_requirements(self, pages: Iterable[Tuple[int, str]]) -> Tuple[List[RequirementTicket], RequirementStats]:
+        """Extract requirements from pages, tallying summary stats as they are appended"""
+        requirements = []
+        stats = RequirementStats()
+        for requirement in self._iter_page_requirements(pages):
+            requirements.append(requirement)
+            stats.add(requirement)
+        return requirements, stats
+    
+    def _iter_page_requirements(self, pages: Iterable[Tuple[int, str]]) -> Iterator[RequirementTicket]:
+        """Extract requirements lazily from (page number, text) pairs"""
+        for page_num, text in pages:
+            requirement = self._extract_requirement_from_text(text, page_num)
             if requirement:
-                requirements.append(requirement)
-        
-        return ParsedDocument(
-            filename=os.path.basename(file_path),
-            total_pages=section_num,
-            requirements=requirements,
-            summary=self._generate_document_summary(requirements),
-            metadata={"parser": "python-docx", "file_type": "docx"}
-        )
+                yield requirement
     
     def _extract_requirement_from_text(self, text: str, page_num: int) -> Optional[RequirementTicket]:
+        """Extract structured requirement from text, reusing results for repeated pages"""
+        key = (_content_key(text), page_num)
+        cached = self._requirement_cache.get(key, _MISSING)
+        if cached is not _MISSING:
+            return cached
+        
+        requirement = self._build_requirement_from_text(text, page_num)
+        self._requirement_cache.put(key, requirement)
+        return requirement
+    
+    def _build_requirement_from_text(self, text: str, page_num: int) -> Optional[RequirementTicket]:
         """Extract structured requirement from text using heuristics and patterns"""
         
         # Clean and normalize text
@@ -189,54 +347,98 @@ class DocumentParser:
         if not text or len(text.strip()) < 50:  # Skip very short sections
             return None
         
+        # Split once and collect every labelled section in a single pass
+        lines = text.split('\n')
+        sections = self._scan_sections(lines)
+        
         # Extract title (usually first line or after "Title:" pattern)
-        title = self._extract_title(text)
+        title = self._title_from_lines(lines)
         
         # Extract features (look for bullet points, numbered lists)
-        features = self._extract_features(text)
+        features = self._collect_list_items(sections['features:'])
         
         # Extract priority (look for priority indicators)
         priority = self._extract_priority(text)
         
         # Extract acceptance criteria
-        acceptance_criteria = self._extract_acceptance_criteria(text)
+        acceptance_criteria = self._collect_list_items(sections['acceptance criteria:'])
         
         # Extract technical notes
-        technical_notes = self._extract_technical_notes(text)
+        technical_notes = " ".join(sections['technical notes:'])
         
         # Generate description (remaining text)
-        description = self._generate_description(text, title, features, acceptance_criteria)
+        description = self._description_from_sections(
+            text, title, features, acceptance_criteria, sections['description:']
+        )
         
         return RequirementTicket(
             page_number=page_num,
             title=title,
             description=description,
-            features=features,
+            features=tuple(features),
             priority=priority,
-            acceptance_criteria=acceptance_criteria,
+            acceptance_criteria=tuple(acceptance_criteria),
             technical_notes=technical_notes,
             raw_text=text
         )
     
     def _clean_text(self, text: str) -> str:
         """Clean and normalize text while preserving line breaks"""
-        # Remove excessive whitespace but preserve line breaks
-        lines = text.split('\n')
-        cleaned_lines = []
-        for line in lines:
-            line = line.strip()
-            if line:  # Only keep non-empty lines
-                cleaned_lines.append(line)
+        # Remove common PDF artifacts in one C-level pass
+        text = text.translate(self._PDF_ARTIFACTS_TABLE)
         
-        # Remove common PDF artifacts
-        text = '\n'.join(cleaned_lines)
-        text = text.replace("", "")  # Form feed
-        return text.strip()
+        # Remove excessive whitespace but preserve line breaks, keeping only non-empty lines
+        stripped_lines = (line.strip() for line in text.split('\n'))
+        return '\n'.join(line for line in stripped_lines if line)
     
-    def _extract_title(self, text: str) -> str:
-        """Extract title from text"""
-        lines = text.split('\n')
+    def _scan_sections(self, lines: List[str]) -> Dict[str, List[str]]:
+        """Collect the body lines of each labelled section in one pass over the text
         
+        A section starts at the first line mentioning its header and ends at the
+        next line mentioning any other section header.
+        """
+        sections = {marker: [] for marker in self._SECTION_MARKERS}
+        active = set()
+        finished = set()
+        
+        for line in lines:
+            line = line.strip()
+            markers = {m.lower() for m in self._SECTION_MARKER_RE.findall(line)}
+            
+            for marker in self._SECTION_MARKERS:
+                if marker in finished:
+                    continue
+                
+                # Check for section start
+                if marker in markers:
+                    active.add(marker)
+                    continue
+                
+                if marker in active:
+                    # Check for section end (next major section)
+                    if markers:
+                        active.discard(marker)
+                        finished.add(marker)
+                    elif line:
+                        sections[marker].append(line)
+        
+        return sections
+    
+    def _collect_list_items(self, section_lines: List[str]) -> List[str]:
+        """Turn the lines of a list section (features, criteria) into items"""
+        items = []
+        for line in section_lines:
+            if self._BULLET_RE.match(line):
+                item = self._BULLET_STRIP_RE.sub('', line).strip()
+                if item and len(item) > 5:
+                    items.append(item)
+            elif len(line) > 10 and not self._UNBULLETED_SKIP_RE.match(line):
+                # Handle items without bullet points
+                items.append(line)
+        return items
+    
+    def _title_from_lines(self, lines: List[str]) -> str:
+        """Extract title from the already split lines of a requirement"""
         # Look for "REQUIREMENT X:" pattern
         for line in lines[:5]:  # Check first 5 lines
             line = line.strip()
@@ -253,7 +455,7 @@ class DocumentParser:
             line = line.strip()
             if line and len(line) < 100 and not line.startswith(('•', '-', '1.', '2.')):
                 # Make sure it's not a section header
-                if not any(phrase in line.lower() for phrase in ['priority:', 'description:', 'features:', 'acceptance criteria:', 'technical notes:']):
+                if not self._SECTION_HEADER_RE.search(line):
                     return line
         
         # Fallback: use first meaningful line
@@ -264,181 +466,67 @@ class DocumentParser:
         
         return "Untitled Requirement"
     
-    def _extract_features(self, text: str) -> List[str]:
-        """Extract features from text"""
-        features = []
-        
-        # Look for "Features:" section
-        lines = text.split('\n')
-        in_features_section = False
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Check for Features section start
-            if 'features:' in line.lower():
-                in_features_section = True
-                continue
-            
-            # Check for section end (next major section)
-            if in_features_section and any(phrase in line.lower() for phrase in ['acceptance criteria:', 'technical notes:', 'description:']):
-                break
-            
-            # Extract features with bullet points
-            if in_features_section and line:
-                if line.startswith(('•', '-', '*', '1.', '2.', '3.')):
-                    feature = line.lstrip('•-*1234567890. ').strip()
-                    if feature and len(feature) > 5:
-                        features.append(feature)
-                elif line and len(line) > 10 and not line.lower().startswith(('priority:', 'description:')):
-                    # Handle features without bullet points
-                    features.append(line)
-        
-        return features
-    
     def _extract_priority(self, text: str) -> str:
         """Extract priority from text"""
-        text_lower = text.lower()
-        
-        # Look for "Priority: High/Medium/Low" pattern
-        if 'priority: high' in text_lower:
-            return "High"
-        elif 'priority: medium' in text_lower:
-            return "Medium"
-        elif 'priority: low' in text_lower:
-            return "Low"
-        
-        # Fallback to keyword search
-        if any(word in text_lower for word in ['high priority', 'critical', 'urgent']):
-            return "High"
-        elif any(word in text_lower for word in ['medium priority', 'normal']):
-            return "Medium"
-        elif any(word in text_lower for word in ['low priority', 'nice to have']):
-            return "Low"
-        
-        return "Medium"  # Default
-    
-    def _extract_acceptance_criteria(self, text: str) -> List[str]:
-        """Extract acceptance criteria from text"""
-        criteria = []
-        
-        # Look for "Acceptance Criteria:" section
-        lines = text.split('\n')
-        in_criteria_section = False
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Check for Acceptance Criteria section start
-            if 'acceptance criteria:' in line.lower():
-                in_criteria_section = True
-                continue
-            
-            # Check for section end (next major section)
-            if in_criteria_section and any(phrase in line.lower() for phrase in ['technical notes:', 'features:', 'description:']):
-                break
-            
-            # Extract criteria with bullet points
-            if in_criteria_section and line:
-                if line.startswith(('•', '-', '*', '1.', '2.', '3.')):
-                    criterion = line.lstrip('•-*1234567890. ').strip()
-                    if criterion and len(criterion) > 5:
-                        criteria.append(criterion)
-                elif line and len(line) > 10 and not line.lower().startswith(('priority:', 'description:')):
-                    # Handle criteria without bullet points
-                    criteria.append(line)
-        
-        return criteria
-    
-    def _extract_technical_notes(self, text: str) -> str:
-        """Extract technical notes from text"""
-        # Look for "Technical Notes:" section
-        lines = text.split('\n')
-        technical_lines = []
-        in_technical_section = False
+        # Collect explicit fields and keyword categories in one pass over the text
+        fields = set()
+        keywords = set()
+        for match in self._PRIORITY_KEYWORD_RE.finditer(text):
+            if match.lastgroup == 'field':
+                fields.add(match.group('field').capitalize())
+            else:
+                keywords.add(match.lastgroup.capitalize())
         
-        for line in lines:
-            line = line.strip()
-            
-            # Check for Technical Notes section start
-            if 'technical notes:' in line.lower():
-                in_technical_section = True
-                continue
-            
-            # Check for section end (next major section)
-            if in_technical_section and any(phrase in line.lower() for phrase in ['acceptance criteria:', 'features:', 'description:']):
-                break
-            
-            # Extract technical notes
-            if in_technical_section and line:
-                technical_lines.append(line)
+        # Look for "Priority: High/Medium/Low" pattern, then fall back to keywords
+        for found in (fields, keywords):
+            for level in ("High", "Medium", "Low"):
+                if level in found:
+                    return level
         
-        return " ".join(technical_lines)
+        return "Medium"  # Default
     
-    def _generate_description(self, text: str, title: str, features: List[str], criteria: List[str]) -> str:
-        """Generate description from remaining text"""
-        # Look for "Description:" section specifically
-        lines = text.split('\n')
-        description_lines = []
-        in_description_section = False
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Check for Description section start
-            if 'description:' in line.lower():
-                in_description_section = True
-                continue
-            
-            # Check for section end (next major section)
-            if in_description_section and any(phrase in line.lower() for phrase in ['features:', 'acceptance criteria:', 'technical notes:']):
-                break
-            
-            # Extract description
-            if in_description_section and line:
-                description_lines.append(line)
-        
+    def _description_from_sections(self, text: str, title: str, features: List[str],
+                                   criteria: List[str], description_lines: List[str]) -> str:
+        """Build the description from the "Description:" section or the remaining text"""
         if description_lines:
             return " ".join(description_lines)
         
-        # Fallback: extract remaining text
+        # Fallback: extract remaining text, removing title, features and criteria in turn
+        # (sequentially, so a phrase exposed by an earlier removal is still removed)
         description = text
-        
-        # Remove title
-        if title in description:
-            description = description.replace(title, "")
-        
-        # Remove features
-        for feature in features:
-            if feature in description:
-                description = description.replace(feature, "")
-        
-        # Remove criteria
-        for criterion in criteria:
-            if criterion in description:
-                description = description.replace(criterion, "")
+        for phrase in (title, *features, *criteria):
+            description = description.replace(phrase, "")
         
         # Clean up
         description = " ".join(description.split())
         return description[:800]  # Increased limit for better descriptions
     
-    def _is_new_section(self, paragraph) -> bool:
-        """Check if paragraph starts a new section"""
+    def _is_new_section(self, paragraph, style_cache: Optional[Dict[Optional[str], bool]] = None) -> bool:
+        """Check if paragraph starts a new section
+        
+        Cheap text checks run first. Resolving ``paragraph.style`` walks the
+        document's styles part, so when a ``style_cache`` is given the heading
+        check is remembered per style id for the rest of the document.
+        """
         text = paragraph.text.strip()
         
-        # Check for heading styles
-        if paragraph.style.name.startswith('Heading'):
+        # Check for numbering patterns
+        if self._NUMBERED_RE.match(text):
             return True
         
         # Check for common section patterns
-        if any(pattern in text.lower() for pattern in ['requirement', 'feature', 'story', 'ticket']):
+        if self._SECTION_KEYWORD_RE.search(text):
             return True
         
-        # Check for numbering patterns
-        if text and text[0].isdigit() and '.' in text[:5]:
-            return True
-        
-        return False
+        # Check for heading styles
+        if style_cache is None:
+            return paragraph.style.name.startswith('Heading')
+        
+        style_id = paragraph._p.style
+        is_heading = style_cache.get(style_id)
+        if is_heading is None:
+            is_heading = style_cache[style_id] = paragraph.style.name.startswith('Heading')
+        return is_heading
     
     def _group_elements_by_page(self, elements) -> Dict[int, List]:
         """Group unstructured elements by page"""
@@ -457,53 +545,48 @@ class DocumentParser:
         
         return pages
     
-    def _generate_document_summary(self, requirements: List[RequirementTicket]) -> str:
-        """Generate summary of the document"""
-        if not requirements:
+    def _summary_from_stats(self, stats: RequirementStats) -> str:
+        """Generate summary of the document from precomputed requirement stats"""
+        if not stats.count:
             return "No requirements found in document."
         
         summary_parts = [
-            f"Document contains {len(requirements)} requirement tickets:",
-            f"- High priority: {len([r for r in requirements if r.priority == 'High'])}",
-            f"- Medium priority: {len([r for r in requirements if r.priority == 'Medium'])}",
-            f"- Low priority: {len([r for r in requirements if r.priority == 'Low'])}",
-            f"- Total features: {sum(len(r.features) for r in requirements)}"
+            f"Document contains {stats.count} requirement tickets:",
+            f"- High priority: {stats.priority_counts['High']}",
+            f"- Medium priority: {stats.priority_counts['Medium']}",
+            f"- Low priority: {stats.priority_counts['Low']}",
+            f"- Total features: {stats.feature_total}"
         ]
         
         return " ".join(summary_parts)
     
     def chunk_for_llama(self, parsed_doc: ParsedDocument, max_tokens: int = 4000) -> List[str]:
         """Chunk document for Llama processing"""
-        chunks = []
-        
-        # Create comprehensive text representation
-        full_text = f"Document: {parsed_doc.filename}\n"
-        full_text += f"Summary: {parsed_doc.summary}\n\n"
-        
-        for req in parsed_doc.requirements:
-            req_text = f"Requirement {req.page_number}:\n"
-            req_text += f"Title: {req.title}\n"
-            req_text += f"Priority: {req.priority}\n"
-            req_text += f"Description: {req.description}\n"
-            req_text += f"Features: {', '.join(req.features)}\n"
-            req_text += f"Acceptance Criteria: {', '.join(req.acceptance_criteria)}\n"
-            if req.technical_notes:
-                req_text += f"Technical Notes: {req.technical_notes}\n"
-            req_text += "\n"
-            
-            full_text += req_text
-        
-        # Split into chunks
-        text_chunks = self.text_splitter.split_text(full_text)
-        
-        # Ensure chunks don't exceed token limit
-        for chunk in text_chunks:
-            tokens = len(self.tokenizer.encode(chunk))
-            if tokens <= max_tokens:
-                chunks.append(chunk)
-            else:
-                # Further split if needed
-                sub_chunks = self.text_splitter.split_text(chunk)
-                chunks.extend(sub_chunks)
-        
-        return chunks 
\ No newline at end of file
+        parts = [f"Document: {parsed_doc.filename}\nSummary: {parsed_doc.summary}\n\n"]
+        parts.extend(self._format_requirement_for_llama(req) for req in parsed_doc.requirements)
+        return self._split_within_token_limit("".join(parts), max_tokens)
+    
+    def _format_requirement_for_llama(self, req: RequirementTicket) -> str:
+        """Render a single requirement as plain text for the Llama prompt"""
+        parts = [
+            f"Requirement {req.page_number}:\n",
+            f"Title: {req.title}\n",
+            f"Priority: {req.priority}\n",
+            f"Description: {req.description}\n",
+            f"Features: {', '.join(req.features)}\n",
+            f"Acceptance Criteria: {', '.join(req.acceptance_criteria)}\n",
+        ]
+        if req.technical_notes:
+            parts.append(f"Technical Notes: {req.technical_notes}\n")
+        parts.append("\n")
+        return "".join(parts)
+    
+    def _split_within_token_limit(self, text: str, max_tokens: int) -> List[str]:
+        """Split text into chunks of at most max_tokens tokens, reusing earlier work on the same text"""
+        key = (_content_key(text), max_tokens)
+        chunks = self._chunk_cache.get(key)
+        if chunks is None:
+            # The splitter measures length in tokens, so no chunk needs re-encoding or re-splitting
+            chunks = _get_text_splitter(max_tokens).split_text(text)
+            self._chunk_cache.put(key, chunks)
+        return list(chunks)
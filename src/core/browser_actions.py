@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Browser Actions - Parses action descriptions into structured browser actions
+"""
+
+import re
+from typing import Optional
+from dataclasses import dataclass
+
+# Precompiled patterns for parsing action descriptions
+# One alternation classifies every action keyword in a single scan; when several
+# kinds match, the first kind in _ACTION_TYPE_PRIORITY wins
+_ACTION_TYPE_PATTERN = re.compile(
+    r'(?P<click>\bclick|\bpress|\btap)'
+    r'|(?P<type>\btype|\benter|\binput|\bfill)'
+    r'|(?P<navigate>\bnavigate|\bgo to|\bvisit|\bopen)'
+    r'|(?P<wait>\bwait|\bpause|\bdelay)'
+    r'|(?P<scroll>\bscroll)',
+    re.IGNORECASE
+)
+_ACTION_TYPE_PRIORITY = ('click', 'type', 'navigate', 'wait', 'scroll')
+# Selector sources in priority order, combined into one regex. The leading
+# lazy prefix anchors every alternative at the start of the description, so
+# an earlier alternative wins over a later one even if the later one would
+# match further left (the same result as trying the patterns one by one).
+_SELECTOR_RE = re.compile(r'''
+    \A[\s\S]*?button.*?["'](?P<button>[^"']+)["']  # button with text
+  | \A[\s\S]*?link.*?["'](?P<link>[^"']+)["']      # link with text
+  | \A[\s\S]*?field.*?["'](?P<field>[^"']+)["']    # field with text
+  | \A[\s\S]*?["'](?P<quoted>[^"']+)["']          # anything in quotes
+  | \A[\s\S]*?\#(?P<id>[a-zA-Z0-9_-]+)             # ID selector
+  | \A[\s\S]*?\.(?P<cls>[a-zA-Z0-9_-]+)            # class selector
+''', re.IGNORECASE | re.VERBOSE)
+_QUOTED_TEXT_PATTERN = re.compile(r'["\']([^"\']+)["\']')
+_URL_PATTERN = re.compile(r'https?://[^\s]+')
+_PATH_PATTERN = re.compile(r'/([a-zA-Z0-9/_-]+)')
+# (pattern, multiplier to seconds)
+_WAIT_PATTERNS = [
+    (re.compile(r'(\d+)\s*seconds?', re.IGNORECASE), 1),
+    (re.compile(r'(\d+)\s*s', re.IGNORECASE), 1),
+    (re.compile(r'(\d+)\s*minutes?', re.IGNORECASE), 60),
+    (re.compile(r'(\d+)\s*m', re.IGNORECASE), 60),
+]
+
+def _compile_fallbacks(fallbacks):
+    """Compile a (keywords, value) table into one lookahead alternation plus its values.
+    
+    Group fN marks fallback N. Every alternative is zero-width, so a keyword that
+    overlaps another is still seen; at a shared position the earlier fallback wins.
+    """
+    pattern = re.compile('|'.join(
+        f'(?=(?P<f{index}>{"|".join(map(re.escape, keywords))}))'
+        for index, (keywords, _) in enumerate(fallbacks)
+    ))
+    return pattern, tuple(value for _, value in fallbacks)
+
+# Keyword fallbacks, checked in order: (keywords, value)
+_SELECTOR_FALLBACKS = _compile_fallbacks((
+    (('login',), 'input[type="email"], input[name="email"], input[name="username"]'),
+    (('password',), 'input[type="password"]'),
+    (('submit',), 'button[type="submit"], input[type="submit"]'),
+    (('menu',), 'nav, .menu, .navigation'),
+    (('dashboard',), '.dashboard, #dashboard, [data-testid="dashboard"]'),
+))
+_TEXT_FALLBACKS = _compile_fallbacks((
+    (('email', 'username'), 'demo@example.com'),
+    (('password',), 'demo123'),
+    (('name',), 'Demo User'),
+))
+_PATH_FALLBACKS = _compile_fallbacks((
+    (('dashboard',), '/dashboard'),
+    (('login',), '/login'),
+    (('home',), '/'),
+))
+
+def _keyword_fallback(description_lower: str, fallbacks, default):
+    """Return the value of the first fallback whose keywords appear in the description"""
+    pattern, values = fallbacks
+    found = {match.lastgroup for match in pattern.finditer(description_lower)}
+    for index, value in enumerate(values):
+        if f'f{index}' in found:
+            return value
+    return default
+
+@dataclass(slots=True, frozen=True)
+class BrowserAction:
+    """Represents a browser action with timing and parameters"""
+    action_type: str
+    selector: Optional[str] = None
+    text: Optional[str] = None
+    url: Optional[str] = None
+    wait_time: float = 2.0
+    description: str = ""
+    relative_url: bool = False  # url is a path the executing agent still joins to its base URL
+
+def parse_action(description: str, base_url: str = "") -> Optional[BrowserAction]:
+    """Parse action description into structured action
+    
+    Without a base_url, paths found in the description stay relative and the
+    action is marked relative_url; the agent resolves them against its demo
+    URL when the action runs.
+    """
+    
+    description_lower = description.lower()
+    found = {match.lastgroup for match in _ACTION_TYPE_PATTERN.finditer(description)}
+    action_type = next((kind for kind in _ACTION_TYPE_PRIORITY if kind in found), None)
+    
+    # Click actions
+    if action_type == "click":
+        selector = _extract_selector(description, description_lower)
+        return BrowserAction(
+            action_type="click",
+            selector=selector,
+            description=description
+        )
+    
+    # Type actions
+    elif action_type == "type":
+        selector = _extract_selector(description, description_lower)
+        text = _extract_text(description, description_lower)
+        return BrowserAction(
+            action_type="type",
+            selector=selector,
+            text=text,
+            description=description
+        )
+    
+    # Navigate actions
+    elif action_type == "navigate":
+        url = _extract_url(description, description_lower, base_url)
+        return BrowserAction(
+            action_type="navigate",
+            url=url,
+            description=description,
+            relative_url=not base_url and _URL_PATTERN.search(description) is None
+        )
+    
+    # Wait actions
+    elif action_type == "wait":
+        wait_time = _extract_wait_time(description)
+        return BrowserAction(
+            action_type="wait",
+            wait_time=wait_time,
+            description=description
+        )
+    
+    # Scroll actions
+    elif action_type == "scroll":
+        direction = "down" if "down" in description_lower else "up"
+        return BrowserAction(
+            action_type="scroll",
+            text=direction,
+            description=description
+        )
+    
+    return None
+
+def _extract_selector(description: str, description_lower: Optional[str] = None) -> str:
+    """Extract CSS selector from description"""
+    
+    if description_lower is None:
+        description_lower = description.lower()
+    
+    # Common patterns
+    match = _SELECTOR_RE.match(description)
+    if match:
+        return match.group(match.lastgroup)
+    
+    # Fallback selectors based on common elements, then a generic fallback
+    return _keyword_fallback(description_lower, _SELECTOR_FALLBACKS, 'button, a, input')
+
+def _extract_text(description: str, description_lower: Optional[str] = None) -> str:
+    """Extract text to type from description"""
+    
+    if description_lower is None:
+        description_lower = description.lower()
+    
+    # Look for text in quotes
+    match = _QUOTED_TEXT_PATTERN.search(description)
+    if match:
+        return match.group(1)
+    
+    # Common test data
+    return _keyword_fallback(description_lower, _TEXT_FALLBACKS, 'demo')
+
+def _extract_url(description: str, description_lower: Optional[str] = None, base_url: str = "") -> str:
+    """Extract URL from description"""
+    
+    if description_lower is None:
+        description_lower = description.lower()
+    
+    # Look for URL patterns
+    match = _URL_PATTERN.search(description)
+    if match:
+        return match.group(0)
+    
+    # Look for path patterns
+    match = _PATH_PATTERN.search(description)
+    if match:
+        return base_url + match.group(0)
+    
+    # Common paths
+    return base_url + _keyword_fallback(description_lower, _PATH_FALLBACKS, '')
+
+def _extract_wait_time(description: str) -> float:
+    """Extract wait time from description"""
+    
+    # Look for time patterns
+    for pattern, multiplier in _WAIT_PATTERNS:
+        match = pattern.search(description)
+        if match:
+            return int(match.group(1)) * multiplier
+    
+    return 2.0  # Default wait time
@@ -5,21 +5,61 @@ Browser Automation Agent - Executes browser actions synchronized with avatar pre
 
 import asyncio
 import time
-import re
-from typing import Dict, Any, Optional, List
-from dataclasses import dataclass
-from playwright.async_api import async_playwright, Browser, Page
+from array import array
+from typing import Dict, Any, Optional, List, Union
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, TimeoutError as PlaywrightTimeoutError
 import logging
 
-@dataclass
-class BrowserAction:
-    """Represents a browser action with timing and parameters"""
-    action_type: str
-    selector: Optional[str] = None
-    text: Optional[str] = None
-    url: Optional[str] = None
-    wait_time: float = 2.0
-    description: str = ""
+from .browser_actions import BrowserAction, parse_action
+
+logger = logging.getLogger(__name__)
+
+# One Chromium process shared by every BrowserAgent; agents get their own context
+_shared_playwright = None
+_shared_browser: Optional[Browser] = None
+_shared_loop: Optional[asyncio.AbstractEventLoop] = None
+_shared_lock: Optional[asyncio.Lock] = None
+
+async def get_shared_browser() -> Browser:
+    """Return the shared browser, launching it on first use"""
+    global _shared_playwright, _shared_browser, _shared_loop, _shared_lock
+    
+    loop = asyncio.get_running_loop()
+    if _shared_loop is not loop:
+        # First use, or a new event loop (e.g. another asyncio.run()): objects
+        # bound to a previous loop can't be used from this one
+        _shared_loop = loop
+        _shared_lock = asyncio.Lock()
+        _shared_playwright = None
+        _shared_browser = None
+    
+    async with _shared_lock:
+        if _shared_browser is None or not _shared_browser.is_connected():
+            if _shared_playwright is None:
+                _shared_playwright = await async_playwright().start()
+            
+            # Launch browser in visible mode for demo
+            _shared_browser = await _shared_playwright.chromium.launch(
+                headless=False,  # Visible for demo
+                args=[
+                    '--start-maximized',
+                    '--disable-web-security',
+                    '--disable-features=VizDisplayCompositor'
+                ]
+            )
+    
+    return _shared_browser
+
+async def close_shared_browser():
+    """Close the shared browser and stop Playwright"""
+    global _shared_playwright, _shared_browser
+    
+    if _shared_browser is not None:
+        await _shared_browser.close()
+        _shared_browser = None
+    if _shared_playwright is not None:
+        await _shared_playwright.stop()
+        _shared_playwright = None
 
 class BrowserAgent:
     """Browser automation agent for synchronized demos"""
@@ -27,234 +67,121 @@ class BrowserAgent:
     def __init__(self, base_url: str):
         self.base_url = base_url
         self.browser: Optional[Browser] = None
+        self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
         self.is_running = False
         self.current_action = None
-        self.action_history = []
         
-        # Configure logging
-        logging.basicConfig(level=logging.INFO)
-        self.logger = logging.getLogger(__name__)
+        # Action history, stored column-wise; timestamps are monotonic
+        # nanoseconds since the agent was created
+        self._t0 = time.monotonic_ns()
+        self._hist_desc: List[str] = []
+        self._hist_action: List[BrowserAction] = []
+        self._hist_ts = array('q')
+        self._hist_ok = bytearray()
+        
+        # Logging is configured by the application, not per agent
+        self.logger = logger
     
     async def initialize(self):
         """Initialize browser and page"""
         
         try:
-            self.playwright = await async_playwright().start()
-            
-            # Launch browser in visible mode for demo
-            self.browser = await self.playwright.chromium.launch(
-                headless=False,  # Visible for demo
-                args=[
-                    '--start-maximized',
-                    '--disable-web-security',
-                    '--disable-features=VizDisplayCompositor'
-                ]
-            )
+            # Reuse the shared browser process; a fresh context keeps agents isolated
+            self.browser = await get_shared_browser()
+            self.context = await self.browser.new_context(viewport={"width": 1920, "height": 1080})
             
             # Create new page
-            self.page = await self.browser.new_page()
-            
-            # Set viewport
-            await self.page.set_viewport_size({"width": 1920, "height": 1080})
+            self.page = await self.context.new_page()
             
             # Navigate to base URL
             await self.page.goto(self.base_url)
             
             self.is_running = True
-            self.logger.info(f"🌐 Browser agent initialized for: {self.base_url}")
+            self.logger.info("🌐 Browser agent initialized for: %s", self.base_url)
             
         except Exception as e:
-            self.logger.error(f"❌ Failed to initialize browser agent: {e}")
+            self.logger.error("❌ Failed to initialize browser agent: %s", e)
             raise
     
-    async def execute_action(self, action_description: str) -> bool:
-        """Execute a browser action based on description"""
+    async def execute_action(self, action_description: Union[str, BrowserAction]) -> bool:
+        """Execute a browser action based on description, or an already parsed BrowserAction"""
         
         if not self.is_running or not self.page:
             self.logger.error("Browser agent not initialized")
             return False
         
         try:
+            if isinstance(action_description, BrowserAction):
+                # Parsed ahead of time (e.g. when the demo script was loaded)
+                action = action_description
+                action_description = action.description
+            else:
+                action = None
+            
             self.current_action = action_description
-            self.logger.info(f"🤖 Executing: {action_description}")
+            self.logger.info("🤖 Executing: %s", action_description)
             
             # Parse action description
-            action = self._parse_action(action_description)
+            if action is None:
+                action = self._parse_action(action_description)
             
             if not action:
-                self.logger.warning(f"⚠️ Could not parse action: {action_description}")
+                self.logger.warning("⚠️ Could not parse action: %s", action_description)
                 return False
             
             # Execute the action
             success = await self._execute_parsed_action(action)
             
             if success:
-                self.action_history.append({
-                    "description": action_description,
-                    "action": action,
-                    "timestamp": time.time(),
-                    "success": True
-                })
-                self.logger.info(f"✅ Action completed: {action_description}")
+                self._record_action(action_description, action, success)
+                self.logger.info("✅ Action completed: %s", action_description)
             else:
-                self.logger.error(f"❌ Action failed: {action_description}")
+                self.logger.error("❌ Action failed: %s", action_description)
             
             return success
             
         except Exception as e:
-            self.logger.error(f"❌ Action execution error: {e}")
+            self.logger.error("❌ Action execution error: %s", e)
             return False
     
-    def _parse_action(self, description: str) -> Optional[BrowserAction]:
-        """Parse action description into structured action"""
-        
-        description_lower = description.lower()
-        
-        # Click actions
-        if any(word in description_lower for word in ['click', 'press', 'tap']):
-            selector = self._extract_selector(description)
-            return BrowserAction(
-                action_type="click",
-                selector=selector,
-                description=description
-            )
-        
-        # Type actions
-        elif any(word in description_lower for word in ['type', 'enter', 'input', 'fill']):
-            selector = self._extract_selector(description)
-            text = self._extract_text(description)
-            return BrowserAction(
-                action_type="type",
-                selector=selector,
-                text=text,
-                description=description
-            )
-        
-        # Navigate actions
-        elif any(word in description_lower for word in ['navigate', 'go to', 'visit', 'open']):
-            url = self._extract_url(description)
-            return BrowserAction(
-                action_type="navigate",
-                url=url,
-                description=description
-            )
-        
-        # Wait actions
-        elif any(word in description_lower for word in ['wait', 'pause', 'delay']):
-            wait_time = self._extract_wait_time(description)
-            return BrowserAction(
-                action_type="wait",
-                wait_time=wait_time,
-                description=description
-            )
-        
-        # Scroll actions
-        elif any(word in description_lower for word in ['scroll', 'scroll down', 'scroll up']):
-            direction = "down" if "down" in description_lower else "up"
-            return BrowserAction(
-                action_type="scroll",
-                text=direction,
-                description=description
-            )
-        
-        return None
-    
-    def _extract_selector(self, description: str) -> str:
-        """Extract CSS selector from description"""
-        
-        # Common patterns
-        patterns = [
-            r'button.*?["\']([^"\']+)["\']',  # button with text
-            r'link.*?["\']([^"\']+)["\']',    # link with text
-            r'field.*?["\']([^"\']+)["\']',   # field with text
-            r'["\']([^"\']+)["\']',           # anything in quotes
-            r'#([a-zA-Z0-9_-]+)',             # ID selector
-            r'\.([a-zA-Z0-9_-]+)',            # class selector
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, description, re.IGNORECASE)
-            if match:
-                return match.group(1)
-        
-        # Fallback selectors based on common elements
-        if 'login' in description.lower():
-            return 'input[type="email"], input[name="email"], input[name="username"]'
-        elif 'password' in description.lower():
-            return 'input[type="password"]'
-        elif 'submit' in description.lower():
-            return 'button[type="submit"], input[type="submit"]'
-        elif 'menu' in description.lower():
-            return 'nav, .menu, .navigation'
-        elif 'dashboard' in description.lower():
-            return '.dashboard, #dashboard, [data-testid="dashboard"]'
-        
-        return 'button, a, input'  # Generic fallback
-    
-    def _extract_text(self, description: str) -> str:
-        """Extract text to type from description"""
-        
-        # Look for text in quotes
-        match = re.search(r'["\']([^"\']+)["\']', description)
-        if match:
-            return match.group(1)
-        
-        # Common test data
-        if 'email' in description.lower() or 'username' in description.lower():
-            return 'demo@example.com'
-        elif 'password' in description.lower():
-            return 'demo123'
-        elif 'name' in description.lower():
-            return 'Demo User'
-        
-        return 'demo'
-    
-    def _extract_url(self, description: str) -> str:
-        """Extract URL from description"""
+    async def prepare_action(self, action_description: Union[str, BrowserAction], timeout: int = 5000):
+        """Warm up an upcoming action while the current one is still running
         
-        # Look for URL patterns
-        url_pattern = r'https?://[^\s]+'
-        match = re.search(url_pattern, description)
-        if match:
-            return match.group(0)
+        Waits for a click/type target to be attached to the page, or asks the
+        browser to prefetch a navigation target, so the later execute_action
+        finds its element or page ready. Failures are ignored: this is only a hint.
+        """
         
-        # Look for path patterns
-        path_pattern = r'/([a-zA-Z0-9/_-]+)'
-        match = re.search(path_pattern, description)
-        if match:
-            return self.base_url + match.group(0)
+        if not self.is_running or not self.page:
+            return
         
-        # Common paths
-        if 'dashboard' in description.lower():
-            return self.base_url + '/dashboard'
-        elif 'login' in description.lower():
-            return self.base_url + '/login'
-        elif 'home' in description.lower():
-            return self.base_url + '/'
+        if isinstance(action_description, BrowserAction):
+            action = action_description
+        else:
+            action = self._parse_action(action_description)
+        if not action:
+            return
         
-        return self.base_url
+        try:
+            if action.action_type in ("click", "type") and action.selector:
+                await self.page.locator(action.selector).first.wait_for(state="attached", timeout=timeout)
+            elif action.action_type == "navigate" and action.url:
+                await self.page.evaluate(
+                    """url => {
+                        const link = document.createElement('link');
+                        link.rel = 'prefetch';
+                        link.href = url;
+                        document.head.appendChild(link);
+                    }""",
+                    self._resolve_url(action)
+                )
+        except Exception as e:
+            self.logger.debug("Prefetch skipped for '%s': %s", action_description, e)
     
-    def _extract_wait_time(self, description: str) -> float:
-        """Extract wait time from description"""
-        
-        # Look for time patterns
-        time_patterns = [
-            r'(\d+)\s*seconds?',
-            r'(\d+)\s*s',
-            r'(\d+)\s*minutes?',
-            r'(\d+)\s*m'
-        ]
-        
-        for pattern in time_patterns:
-            match = re.search(pattern, description, re.IGNORECASE)
-            if match:
-                value = int(match.group(1))
-                if 'minute' in pattern or 'm' in pattern:
-                    return value * 60
-                return value
-        
-        return 2.0  # Default wait time
+    def _parse_action(self, description: str) -> Optional[BrowserAction]:
+        """Parse action description into structured action"""
+        return parse_action(description, self.base_url)
     
     async def _execute_parsed_action(self, action: BrowserAction) -> bool:
         """Execute a parsed browser action"""
@@ -271,11 +198,11 @@ class BrowserAgent:
             elif action.action_type == "scroll":
                 return await self._scroll_action(action)
             else:
-                self.logger.warning(f"⚠️ Unknown action type: {action.action_type}")
+                self.logger.warning("⚠️ Unknown action type: %s", action.action_type)
                 return False
                 
         except Exception as e:
-            self.logger.error(f"❌ Action execution error: {e}")
+            self.logger.error("❌ Action execution error: %s", e)
             return False
     
     async def _click_action(self, action: BrowserAction) -> bool:
@@ -283,25 +210,22 @@ class BrowserAgent:
         
         try:
             if action.selector:
-                # Try to find and click the element
-                element = await self.page.query_selector(action.selector)
-                if element:
-                    await element.click()
-                    await self.page.wait_for_timeout(1000)  # Wait for click to register
-                    return True
+                # Try to find and click the element (locator clicks auto-wait for actionability)
+                locator = self.page.locator(action.selector)
+                if await locator.count():
+                    await locator.first.click()
                 else:
                     # Try clicking by text content
-                    await self.page.click(f"text={action.selector}")
-                    await self.page.wait_for_timeout(1000)
-                    return True
+                    await self.page.locator(f"text={action.selector}").first.click()
             else:
                 # Generic click on first clickable element
-                await self.page.click('button, a, [role="button"]')
-                await self.page.wait_for_timeout(1000)
-                return True
+                await self.page.locator('button, a, [role="button"]').first.click()
+            
+            await self._wait_for_page_settle()
+            return True
                 
         except Exception as e:
-            self.logger.error(f"❌ Click action failed: {e}")
+            self.logger.error("❌ Click action failed: %s", e)
             return False
     
     async def _type_action(self, action: BrowserAction) -> bool:
@@ -309,35 +233,41 @@ class BrowserAgent:
         
         try:
             if action.selector and action.text:
-                # Clear and type
-                await self.page.fill(action.selector, "")
-                await self.page.type(action.selector, action.text)
-                await self.page.wait_for_timeout(500)
+                # fill() clears the field and sets the value in one round-trip
+                await self.page.fill(action.selector, action.text)
                 return True
             else:
                 self.logger.warning("⚠️ Type action missing selector or text")
                 return False
                 
         except Exception as e:
-            self.logger.error(f"❌ Type action failed: {e}")
+            self.logger.error("❌ Type action failed: %s", e)
             return False
     
     async def _navigate_action(self, action: BrowserAction) -> bool:
         """Execute navigate action"""
         
         try:
-            if action.url:
-                await self.page.goto(action.url)
-                await self.page.wait_for_load_state("networkidle")
+            if action.url is not None:
+                # Proceed once the DOM is ready; later actions rely on locator auto-waiting
+                await self.page.goto(self._resolve_url(action), wait_until="domcontentloaded")
                 return True
             else:
                 self.logger.warning("⚠️ Navigate action missing URL")
                 return False
                 
         except Exception as e:
-            self.logger.error(f"❌ Navigate action failed: {e}")
+            self.logger.error("❌ Navigate action failed: %s", e)
             return False
     
+    def _resolve_url(self, action: BrowserAction) -> str:
+        """Join a relative URL parsed without a base URL (see DemoOrchestrator.load_demo_script)
+        to this agent's base URL; URLs parsed by the agent itself are used as is"""
+        
+        if action.relative_url:
+            return self.base_url + action.url
+        return action.url
+    
     async def _wait_action(self, action: BrowserAction) -> bool:
         """Execute wait action"""
         
@@ -346,7 +276,7 @@ class BrowserAgent:
             return True
             
         except Exception as e:
-            self.logger.error(f"❌ Wait action failed: {e}")
+            self.logger.error("❌ Wait action failed: %s", e)
             return False
     
     async def _scroll_action(self, action: BrowserAction) -> bool:
@@ -358,13 +288,40 @@ class BrowserAgent:
             else:
                 await self.page.evaluate("window.scrollBy(0, -500)")
             
-            await self.page.wait_for_timeout(1000)
             return True
             
         except Exception as e:
-            self.logger.error(f"❌ Scroll action failed: {e}")
+            self.logger.error("❌ Scroll action failed: %s", e)
             return False
     
+    async def _wait_for_page_settle(self, timeout: int = 2000):
+        """Wait for a navigation triggered by the last action, instead of a fixed sleep"""
+        
+        try:
+            await self.page.wait_for_load_state("domcontentloaded", timeout=timeout)
+        except PlaywrightTimeoutError:
+            self.logger.debug("Page did not reach domcontentloaded within %d ms", timeout)
+    
+    def _record_action(self, description: str, action: BrowserAction, success: bool):
+        """Append an executed action to the history columns"""
+        
+        self._hist_desc.append(description)
+        self._hist_action.append(action)
+        self._hist_ts.append(time.monotonic_ns() - self._t0)
+        self._hist_ok.append(success)
+    
+    @property
+    def action_history(self) -> List[Dict[str, Any]]:
+        """Executed actions as a list of dicts, built from the history columns on demand
+        
+        ``timestamp`` is in seconds since the agent was created.
+        """
+        
+        return [
+            {"description": description, "action": action, "timestamp": timestamp / 1e9, "success": bool(ok)}
+            for description, action, timestamp, ok in zip(self._hist_desc, self._hist_action, self._hist_ts, self._hist_ok)
+        ]
+    
     def get_status(self) -> Dict[str, Any]:
         """Get current agent status"""
         
@@ -376,21 +333,17 @@ class BrowserAgent:
         }
     
     async def cleanup(self):
-        """Clean up browser resources"""
+        """Clean up browser resources (the shared browser stays up for the next agent)"""
         
         try:
-            if self.page:
-                await self.page.close()
-            if self.browser:
-                await self.browser.close()
-            if hasattr(self, 'playwright'):
-                await self.playwright.stop()
+            if self.context:
+                await self.context.close()
             
             self.is_running = False
             self.logger.info("🧹 Browser agent cleaned up")
             
         except Exception as e:
-            self.logger.error(f"❌ Cleanup error: {e}")
+            self.logger.error("❌ Cleanup error: %s", e)
 
 # Example usage
 if __name__ == "__main__":
@@ -414,6 +367,7 @@ if __name__ == "__main__":
             await asyncio.sleep(2)
         
         await agent.cleanup()
+        await close_shared_browser()
     
     # Run test
     asyncio.run(test_browser_agent()) 
\ No newline at end of file
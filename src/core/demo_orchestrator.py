@@ -5,13 +5,86 @@ Demo Orchestrator - Coordinates Tavus avatar presentation with browser automatio
 
 import asyncio
 import json
-import time
-from typing import Dict, Any, Optional, List
+import re
+from string import Template
+from typing import Dict, Any, Optional, List, Set
 from dataclasses import dataclass
-import threading
 from datetime import datetime
 
-@dataclass
+from .browser_actions import BrowserAction, parse_action
+
+# One alternation classifies every gesture keyword in a single scan; when several
+# kinds match, the first gesture in _GESTURE_PRIORITY wins
+_GESTURE_PATTERN = re.compile(
+    r'(?P<point_at_screen>click|button|press)'
+    r'|(?P<typing_gesture>type|enter|input)'
+    r'|(?P<scroll_gesture>scroll|navigate)'
+    r'|(?P<waiting_gesture>wait|pause)',
+    re.IGNORECASE
+)
+_GESTURE_PRIORITY = ('point_at_screen', 'typing_gesture', 'scroll_gesture', 'waiting_gesture')
+
+# Tavus player embed with demo coordination script; $pid and $events are
+# filled in by generate_embed_code, JS template literals escape $ as $$
+_EMBED_TEMPLATE = Template("""
+        <div id="tavus-player-container" style="width: 100%; height: 400px; border: 2px solid #667eea; border-radius: 10px; overflow: hidden;">
+            <iframe 
+                src="https://app.tavus.com/embed/$pid"
+                width="100%" 
+                height="100%" 
+                frameborder="0"
+                allowfullscreen>
+            </iframe>
+        </div>
+        <script>
+            // Demo coordination script
+            const demoEvents = $events;
+            
+            let currentEventIndex = 0;
+            
+            function startDemo() {
+                console.log('Starting synchronized demo...');
+                // Start browser automation
+                window.postMessage({type: 'START_BROWSER_AUTOMATION'}, '*');
+                
+                // Monitor avatar progress
+                setInterval(() => {
+                    if (currentEventIndex < demoEvents.length) {
+                        const event = demoEvents[currentEventIndex];
+                        console.log(`Event $${currentEventIndex + 1}: $${event.browser_action || 'Avatar only'}`);
+                        
+                        if (event.browser_action) {
+                            // Signal browser agent
+                            window.postMessage({
+                                type: 'EXECUTE_BROWSER_ACTION',
+                                action: event.browser_action,
+                                completion_signal: event.completion_signal
+                            }, '*');
+                        }
+                        
+                        currentEventIndex++;
+                    }
+                }, 1000);
+            }
+            
+            // Listen for browser completion signals
+            window.addEventListener('message', (event) => {
+                if (event.data.type === 'BROWSER_ACTION_COMPLETED') {
+                    console.log(`Browser action completed: $${event.data.signal}`);
+                    // Signal avatar to continue
+                    window.postMessage({
+                        type: 'AVATAR_CONTINUE',
+                        signal: event.data.signal
+                    }, '*');
+                }
+            });
+        </script>
+        """)
+
+# How many upcoming browser actions may be warmed up while the current one runs
+_PREFETCH_DEPTH = 2
+
+@dataclass(slots=True, frozen=True)
 class DemoEvent:
     """Represents a demo event with timing and actions"""
     event_id: str
@@ -20,6 +93,7 @@ class DemoEvent:
     browser_action: Optional[str] = None
     completion_signal: Optional[str] = None
     duration: float = 5.0
+    parsed_action: Optional[BrowserAction] = None
 
 class DemoOrchestrator:
     """Orchestrates synchronized demo with avatar and browser automation"""
@@ -30,8 +104,9 @@ class DemoOrchestrator:
         self.is_running = False
         self.avatar_ready = False
         self.browser_ready = False
-        self.completion_signals = {}
+        self.completion_signals: Set[str] = set()
         self.event_callbacks = {}
+        self._embed_events_json = "[]"
         
     def load_demo_script(self, avatar_script: Dict[str, Any], browser_actions: List[str]):
         """Load demo script with avatar and browser coordination"""
@@ -66,11 +141,23 @@ class DemoOrchestrator:
                 avatar_action=segment.get('text', ''),
                 browser_action=browser_action,
                 completion_signal=completion_signal,
-                duration=duration
+                duration=duration,
+                # Parsed once here instead of on every execution; navigation paths stay
+                # relative and are resolved against the demo URL at run time
+                parsed_action=parse_action(browser_action) if browser_action else None
             )
             
             self.events.append(event)
             current_time += duration
+        
+        # Serialize once for generate_embed_code
+        self._embed_events_json = json.dumps([{
+            'id': event.event_id,
+            'timestamp': event.timestamp,
+            'duration': event.duration,
+            'browser_action': event.browser_action,
+            'completion_signal': event.completion_signal
+        } for event in self.events], separators=(',', ':'))
     
     async def start_demo(self, demo_url: str):
         """Start the synchronized demo"""
@@ -84,46 +171,49 @@ class DemoOrchestrator:
         print(f"🚀 Starting synchronized demo with {len(self.events)} events")
         print(f"🌐 Demo URL: {demo_url}")
         
-        # Start browser automation in background
-        browser_thread = threading.Thread(
-            target=self._run_browser_automation,
-            args=(demo_url,)
-        )
-        browser_thread.start()
-        
-        # Start avatar presentation
-        await self._run_avatar_presentation()
+        # The avatar hands each event to the browser as it reaches it
+        event_queue: asyncio.Queue = asyncio.Queue()
         
-        # Wait for completion
-        browser_thread.join()
+        # Run avatar presentation and browser automation concurrently
+        await asyncio.gather(
+            self._run_avatar_presentation(event_queue),
+            self._run_browser_automation(demo_url, event_queue)
+        )
         
         print("✅ Demo completed successfully!")
     
-    async def _run_avatar_presentation(self):
+    async def _run_avatar_presentation(self, event_queue: asyncio.Queue):
         """Run avatar presentation with timing coordination"""
         
-        for i, event in enumerate(self.events):
-            if not self.is_running:
-                break
+        try:
+            for i, event in enumerate(self.events):
+                if not self.is_running:
+                    break
+                    
+                self.current_event_index = i
+                event_queue.put_nowait((i, event))
                 
-            self.current_event_index = i
-            
-            print(f"🎭 Avatar Event {i+1}/{len(self.events)}: {event.avatar_action[:50]}...")
-            
-            # Signal avatar to start this segment
-            await self._signal_avatar_start(event)
-            
-            # Wait for segment duration
-            await asyncio.sleep(event.duration)
-            
-            # Signal completion if there was a browser action
-            if event.completion_signal:
-                self.completion_signals[event.completion_signal] = True
-                print(f"✅ Completed: {event.completion_signal}")
+                print(f"🎭 Avatar Event {i+1}/{len(self.events)}: {event.avatar_action[:50]}...")
+                
+                # Signal avatar to start this segment
+                await self._signal_avatar_start(event)
+                
+                # Wait for segment duration
+                await asyncio.sleep(event.duration)
+                
+                # Signal completion if there was a browser action
+                if event.completion_signal:
+                    self.completion_signals.add(event.completion_signal)
+                    print(f"✅ Completed: {event.completion_signal}")
+        finally:
+            # Tell the browser there are no more events
+            event_queue.put_nowait(None)
     
-    def _run_browser_automation(self, demo_url: str):
-        """Run browser automation in background thread"""
+    async def _run_browser_automation(self, demo_url: str, event_queue: asyncio.Queue):
+        """Run browser automation, executing each event's action once the avatar reaches it"""
         
+        agent = None
+        in_flight = set()
         try:
             print(f"🌐 Starting browser automation for: {demo_url}")
             
@@ -131,34 +221,46 @@ class DemoOrchestrator:
             from .browser_agent import BrowserAgent
             
             agent = BrowserAgent(demo_url)
+            await agent.initialize()
             
-            for i, event in enumerate(self.events):
-                if not self.is_running:
+            prepared_upto = 0  # events before this index already had prepare_action scheduled
+            
+            while True:
+                # Wait for avatar to reach the next event
+                item = await event_queue.get()
+                if item is None or not self.is_running:
                     break
+                i, event = item
                 
-                # Wait for avatar to reach this event
-                while self.current_event_index < i:
-                    time.sleep(0.1)
+                # Look ahead: warm up the next browser actions while this one runs
+                prepared_upto = max(prepared_upto, i + 1)
+                while len(in_flight) < _PREFETCH_DEPTH and prepared_upto < len(self.events):
+                    upcoming = self.events[prepared_upto]
+                    prepared_upto += 1
+                    if upcoming.browser_action:
+                        task = asyncio.create_task(agent.prepare_action(upcoming.parsed_action or upcoming.browser_action))
+                        in_flight.add(task)
+                        task.add_done_callback(in_flight.discard)
                 
                 if event.browser_action:
                     print(f"🤖 Browser Action {i+1}: {event.browser_action}")
                     
                     # Execute browser action
-                    success = agent.execute_action(event.browser_action)
+                    success = await agent.execute_action(event.parsed_action or event.browser_action)
                     
                     if success and event.completion_signal:
-                        self.completion_signals[event.completion_signal] = True
+                        self.completion_signals.add(event.completion_signal)
                         print(f"✅ Browser action completed: {event.completion_signal}")
                     else:
                         print(f"⚠️ Browser action failed: {event.browser_action}")
-                
-                # Wait for event duration
-                time.sleep(event.duration)
-            
-            agent.cleanup()
             
         except Exception as e:
             print(f"❌ Browser automation failed: {e}")
+        finally:
+            for task in in_flight:
+                task.cancel()
+            if agent:
+                await agent.cleanup()
     
     async def _signal_avatar_start(self, event: DemoEvent):
         """Signal avatar to start a segment"""
@@ -183,29 +285,15 @@ class DemoOrchestrator:
         if not action:
             return "presentation_gesture"
         
-        action_lower = action.lower()
-        
-        if any(word in action_lower for word in ['click', 'button', 'press']):
-            return "point_at_screen"
-        elif any(word in action_lower for word in ['type', 'enter', 'input']):
-            return "typing_gesture"
-        elif any(word in action_lower for word in ['scroll', 'navigate']):
-            return "scroll_gesture"
-        elif any(word in action_lower for word in ['wait', 'pause']):
-            return "waiting_gesture"
-        else:
-            return "neutral_gesture"
+        found = {match.lastgroup for match in _GESTURE_PATTERN.finditer(action)}
+        return next((gesture for gesture in _GESTURE_PRIORITY if gesture in found), "neutral_gesture")
     
     async def _call_tavus_api(self, avatar_data: Dict[str, Any]):
         """Call Tavus API to control avatar (placeholder)"""
         
         # This would be the actual Tavus API integration
-        # For now, we'll simulate the API call
-        
+        # For now, the segment is only logged
         try:
-            # Simulate API call
-            await asyncio.sleep(0.1)  # Simulate network delay
-            
             print(f"🎭 Tavus API called: {avatar_data['segment_id']}")
             
         except Exception as e:
@@ -234,72 +322,13 @@ class DemoOrchestrator:
                 "browser_action": current_event.browser_action if current_event else None,
                 "duration": current_event.duration if current_event else None
             },
-            "completion_signals": self.completion_signals
+            "completion_signals": list(self.completion_signals)
         }
     
     def generate_embed_code(self, presentation_id: str) -> str:
         """Generate HTML embed code for Tavus player"""
         
-        return f"""
-        <div id="tavus-player-container" style="width: 100%; height: 400px; border: 2px solid #667eea; border-radius: 10px; overflow: hidden;">
-            <iframe 
-                src="https://app.tavus.com/embed/{presentation_id}"
-                width="100%" 
-                height="100%" 
-                frameborder="0"
-                allowfullscreen>
-            </iframe>
-        </div>
-        <script>
-            // Demo coordination script
-            const demoEvents = {json.dumps([{
-                'id': event.event_id,
-                'timestamp': event.timestamp,
-                'duration': event.duration,
-                'browser_action': event.browser_action,
-                'completion_signal': event.completion_signal
-            } for event in self.events])};
-            
-            let currentEventIndex = 0;
-            
-            function startDemo() {{
-                console.log('Starting synchronized demo...');
-                // Start browser automation
-                window.postMessage({{type: 'START_BROWSER_AUTOMATION'}}, '*');
-                
-                // Monitor avatar progress
-                setInterval(() => {{
-                    if (currentEventIndex < demoEvents.length) {{
-                        const event = demoEvents[currentEventIndex];
-                        console.log(`Event ${{currentEventIndex + 1}}: ${{event.browser_action || 'Avatar only'}}`);
-                        
-                        if (event.browser_action) {{
-                            // Signal browser agent
-                            window.postMessage({{
-                                type: 'EXECUTE_BROWSER_ACTION',
-                                action: event.browser_action,
-                                completion_signal: event.completion_signal
-                            }}, '*');
-                        }}
-                        
-                        currentEventIndex++;
-                    }}
-                }}, 1000);
-            }}
-            
-            // Listen for browser completion signals
-            window.addEventListener('message', (event) => {{
-                if (event.data.type === 'BROWSER_ACTION_COMPLETED') {{
-                    console.log(`Browser action completed: ${{event.data.signal}}`);
-                    // Signal avatar to continue
-                    window.postMessage({{
-                        type: 'AVATAR_CONTINUE',
-                        signal: event.data.signal
-                    }}, '*');
-                }}
-            }});
-        </script>
-        """
+        return _EMBED_TEMPLATE.substitute(pid=presentation_id, events=self._embed_events_json)
 
 # Example usage
 if __name__ == "__main__":
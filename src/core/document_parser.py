@@ -7,6 +7,34 @@ import os
 from typing import List, Dict, Any
 from pathlib import Path
 
+# Mock requirements, built once and returned by every parse fallback
+_MOCK_REQUIREMENTS: List[Dict[str, Any]] = [
+    {
+        "title": "User Authentication",
+        "description": "Implement secure user login system with email and password",
+        "priority": "High",
+        "features": ["Login form", "Password validation", "Session management"],
+        "acceptance_criteria": ["Users can log in with email/password", "Failed attempts are logged"],
+        "technical_notes": "Use JWT tokens for session management"
+    },
+    {
+        "title": "Dashboard Analytics",
+        "description": "Display key metrics and analytics on user dashboard",
+        "priority": "Medium",
+        "features": ["Metrics dashboard", "Real-time updates", "Export functionality"],
+        "acceptance_criteria": ["Dashboard loads within 3 seconds", "Data updates every 30 seconds"],
+        "technical_notes": "Use WebSocket for real-time updates"
+    },
+    {
+        "title": "File Management",
+        "description": "Allow users to upload, organize, and share files",
+        "priority": "Medium",
+        "features": ["File upload", "Folder organization", "Sharing permissions"],
+        "acceptance_criteria": ["Files upload successfully", "Users can create folders", "Sharing works correctly"],
+        "technical_notes": "Use cloud storage for file handling"
+    }
+]
+
 class DocumentParser:
     """Simple document parser for requirements extraction"""
     
@@ -57,31 +85,6 @@ class DocumentParser:
             return self._get_mock_requirements()
     
     def _get_mock_requirements(self) -> List[Dict[str, Any]]:
-        """Return mock requirements for testing"""
+        """Return mock requirements for testing (shared, treat as read-only)"""
         
-        return [
-            {
-                "title": "User Authentication",
-                "description": "Implement secure user login system with email and password",
-                "priority": "High",
-                "features": ["Login form", "Password validation", "Session management"],
-                "acceptance_criteria": ["Users can log in with email/password", "Failed attempts are logged"],
-                "technical_notes": "Use JWT tokens for session management"
-            },
-            {
-                "title": "Dashboard Analytics",
-                "description": "Display key metrics and analytics on user dashboard",
-                "priority": "Medium",
-                "features": ["Metrics dashboard", "Real-time updates", "Export functionality"],
-                "acceptance_criteria": ["Dashboard loads within 3 seconds", "Data updates every 30 seconds"],
-                "technical_notes": "Use WebSocket for real-time updates"
-            },
-            {
-                "title": "File Management",
-                "description": "Allow users to upload, organize, and share files",
-                "priority": "Medium",
-                "features": ["File upload", "Folder organization", "Sharing permissions"],
-                "acceptance_criteria": ["Files upload successfully", "Users can create folders", "Sharing works correctly"],
-                "technical_notes": "Use cloud storage for file handling"
-            }
-        ] 
\ No newline at end of file
+        return _MOCK_REQUIREMENTS
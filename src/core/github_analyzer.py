@@ -5,6 +5,49 @@ GitHub Analyzer - Analyzes GitHub repositories for demo content
 
 from typing import Dict, Any
 
+# Mock analysis, built once; real repository analysis is not implemented yet
+_MOCK_GITHUB_ANALYSIS: Dict[str, Any] = {
+    "repository_info": {
+        "name": "demo-app",
+        "description": "A modern web application for team collaboration",
+        "language": "Python",
+        "stars": 150,
+        "forks": 25,
+        "last_updated": "2024-01-15"
+    },
+    "codebase_summary": "Modern Python web application with React frontend, featuring user authentication, dashboard analytics, and file management capabilities",
+    "key_features": [
+        "User authentication and authorization",
+        "Real-time dashboard with analytics",
+        "File upload and management system",
+        "Team collaboration tools",
+        "API endpoints for mobile integration"
+    ],
+    "architecture": "Microservices architecture with React frontend and Python backend",
+    "tech_stack": [
+        "Python (FastAPI)",
+        "React (TypeScript)",
+        "PostgreSQL",
+        "Redis",
+        "Docker",
+        "AWS"
+    ],
+    "main_components": [
+        "AuthService - Handles user authentication",
+        "DashboardService - Manages analytics and metrics",
+        "FileService - Handles file uploads and storage",
+        "NotificationService - Manages real-time notifications",
+        "APIGateway - Routes requests to appropriate services"
+    ],
+    "user_flows": [
+        "User registration and login",
+        "Dashboard access and analytics viewing",
+        "File upload and organization",
+        "Team collaboration and sharing",
+        "Mobile app integration via API"
+    ]
+}
+
 class GitHubAnalyzer:
     """Simple GitHub repository analyzer"""
     
@@ -21,46 +64,6 @@ class GitHubAnalyzer:
         return self._get_mock_github_analysis()
     
     def _get_mock_github_analysis(self) -> Dict[str, Any]:
-        """Return mock GitHub analysis for testing"""
+        """Return mock GitHub analysis for testing (shared, treat as read-only)"""
         
-        return {
-            "repository_info": {
-                "name": "demo-app",
-                "description": "A modern web application for team collaboration",
-                "language": "Python",
-                "stars": 150,
-                "forks": 25,
-                "last_updated": "2024-01-15"
-            },
-            "codebase_summary": "Modern Python web application with React frontend, featuring user authentication, dashboard analytics, and file management capabilities",
-            "key_features": [
-                "User authentication and authorization",
-                "Real-time dashboard with analytics",
-                "File upload and management system",
-                "Team collaboration tools",
-                "API endpoints for mobile integration"
-            ],
-            "architecture": "Microservices architecture with React frontend and Python backend",
-            "tech_stack": [
-                "Python (FastAPI)",
-                "React (TypeScript)",
-                "PostgreSQL",
-                "Redis",
-                "Docker",
-                "AWS"
-            ],
-            "main_components": [
-                "AuthService - Handles user authentication",
-                "DashboardService - Manages analytics and metrics",
-                "FileService - Handles file uploads and storage",
-                "NotificationService - Manages real-time notifications",
-                "APIGateway - Routes requests to appropriate services"
-            ],
-            "user_flows": [
-                "User registration and login",
-                "Dashboard access and analytics viewing",
-                "File upload and organization",
-                "Team collaboration and sharing",
-                "Mobile app integration via API"
-            ]
-        } 
\ No newline at end of file
+        return _MOCK_GITHUB_ANALYSIS
@@ -2,15 +2,573 @@
 Llama 4 Maverick Client - Handles API interactions for presentation generation
 """
 
-import json
+import asyncio
+import functools
+import hashlib
+import importlib.util
+import json as _stdlib_json
 import os
-from typing import Dict, List, Any
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from string import Template
+from typing import Dict, List, Any, AsyncIterator, Awaitable, Callable, Optional, Protocol, Sequence, Tuple
+import orjson
 from dataclasses import dataclass
-from pydantic import BaseModel
-from llama_api_client import AsyncLlamaAPIClient
-from dotenv import load_dotenv
+from pydantic import BaseModel, ConfigDict, ValidationError
 
-load_dotenv()
+# The API client (and the httpx/anyio stack under it) and python-dotenv are imported
+# where they are used, so importing the context models stays cheap.
+
+@functools.lru_cache(maxsize=1)
+def _load_env_once():
+    """Load .env once per process tree; child processes inherit the loaded variables"""
+    if not os.environ.get("LLAMA_ENV_LOADED"):
+        from dotenv import load_dotenv
+        load_dotenv()
+        os.environ["LLAMA_ENV_LOADED"] = "1"
+
+_load_env_once()
+
+# System prompts for the two generation calls
+_PRESENTATION_SYSTEM_PROMPT = """
+        You are an expert presentation designer and technical communicator. Create compelling presentation scripts that:
+        1. Match the audience's technical level and interests
+        2. Highlight the most relevant features from the codebase
+        3. Tell a compelling story that connects requirements to implementation
+        4. Include specific demo scenarios with clear instructions
+        5. Provide timing and flow recommendations
+        
+        IMPORTANT: Return your response in valid JSON format with this structure:
+        {
+            "title": "Presentation Title",
+            "sections": [
+                {
+                    "title": "Section Title",
+                    "duration": 60,
+                    "content": "Detailed content for this section...",
+                    "demo_trigger": "trigger_name_or_null",
+                    "visual_cue": "visual_element_or_null"
+                }
+            ],
+            "total_duration": 300,
+            "key_points": ["Point 1", "Point 2", "Point 3"],
+            "demo_scenarios": ["Scenario 1", "Scenario 2"],
+            "visual_elements": ["Visual 1", "Visual 2"]
+        }
+        
+        Make the content specific to the provided codebase and requirements. Use the actual feature names, architecture details, and requirements from the context.
+        """
+
+_AGENT_PLAN_SYSTEM_PROMPT = """
+        You are an expert in software demos and agent orchestration. Create detailed agent execution plans that:
+        1. Define which agents are needed for each demo scenario
+        2. Specify the sequence and timing of agent actions
+        3. Include browser automation instructions
+        4. Define success criteria and error handling
+        5. Coordinate with avatar presentation timing
+        6. Plan visual generation and display
+        
+        Provide structured, executable plans that can be used by automation systems.
+        Return your response as a single valid JSON object with the keys agents_required,
+        execution_sequence, demo_scenarios and timing_coordination.
+        """
+
+@functools.lru_cache(maxsize=32)
+def _system_message(system_prompt: str) -> Dict[str, str]:
+    """Chat message for a system prompt, built once per distinct prompt (read-only for callers)"""
+    return {"role": "system", "content": system_prompt}
+
+# Plan returned when a response holds no usable plan
+_DEFAULT_AGENT_EXECUTION_PLAN: Dict[str, Any] = {
+    "agents_required": ["browser_automator", "visual_generator", "tavus_coordinator"],
+    "execution_sequence": [
+        {
+            "step": 1,
+            "agent": "tavus_coordinator",
+            "action": "start_presentation",
+            "duration": 30,
+            "dependencies": []
+        },
+        {
+            "step": 2,
+            "agent": "browser_automator",
+            "action": "navigate_to_app",
+            "duration": 10,
+            "dependencies": ["tavus_coordinator"]
+        },
+        {
+            "step": 3,
+            "agent": "visual_generator",
+            "action": "show_architecture_diagram",
+            "duration": 15,
+            "dependencies": ["browser_automator"]
+        }
+    ],
+    "demo_scenarios": [
+        {
+            "name": "Feature Demo 1",
+            "browser_actions": ["click_button", "fill_form", "verify_result"],
+            "visual_triggers": ["show_diagram", "highlight_feature"],
+            "success_criteria": ["page_loaded", "feature_visible"],
+            "error_handling": ["retry_action", "show_fallback"]
+        }
+    ],
+    "timing_coordination": {
+        "avatar_pauses": [60, 180, 300],
+        "demo_triggers": [90, 210, 330],
+        "visual_cues": [75, 195, 315]
+    }
+}
+
+# Codebase and requirements context shared by every prompt for one codebase/document
+# pair. It comes first, byte-identical across calls, so providers that cache prompt
+# prefixes can reuse it; the per-request templates below are appended to it.
+_SHARED_CONTEXT_TEMPLATE = Template("""
+        === CODEBASE ANALYSIS ===
+        Architecture: $architecture
+        Main Features: $main_features
+        Dependencies: $dependencies
+        Key Components: $key_components
+        User Flows: $user_flows
+        
+        === REQUIREMENTS DOCUMENT ===
+        Document: $filename
+        Summary: $summary
+        Total Requirements: $total_requirements
+        
+        Requirements Details:
+        $requirements
+        """)
+
+_PRESENTATION_CONTEXT_TEMPLATE = Template("""
+        Generate a compelling presentation script based on the detailed context above and this request:
+        
+        === USER PROMPT ===
+        $user_prompt
+        
+        === PRESENTATION REQUEST ===
+        Purpose: $purpose
+        Audience: $audience
+        Duration: $duration minutes
+        Focus Areas: $focus_areas
+        Demo Requirements: $demo_requirements
+        
+        INSTRUCTIONS:
+        1. Use the ACTUAL feature names, architecture, and requirements from the context above
+        2. Create sections that specifically address the documented requirements
+        3. Reference the real codebase features and components
+        4. Make demo scenarios based on the actual user flows and features
+        5. Tailor the content to the specified audience and purpose
+        6. Include specific timing that fits within the $duration minute duration
+        7. Create visual elements that would help explain the actual architecture and features
+        
+        Return your response in valid JSON format as specified in the system prompt.
+        """)
+
+_AGENT_PLANNING_CONTEXT_TEMPLATE = Template("""
+        Create an agent execution plan, based on the context above, for the following presentation:
+        
+        === PRESENTATION SCRIPT ===
+        $presentation_script
+        
+        === USER PROMPT ===
+        $user_prompt
+        
+        Create a detailed agent execution plan that:
+        1. Defines which agents (browser automation, visual generation, etc.) are needed
+        2. Specifies the exact sequence and timing of actions
+        3. Includes precise browser automation instructions
+        4. Defines success criteria and error handling
+        5. Coordinates with avatar presentation timing
+        6. Plans visual generation and display timing
+        
+        Focus on creating executable, step-by-step instructions for each demo scenario.
+        """)
+
+_USER_PROMPT_CONTEXT_TEMPLATE = Template("""
+        === USER PROMPT ===
+        $user_prompt
+        """)
+
+def _dumps_indented(obj: Any) -> str:
+    """Serialize obj as 2-space indented JSON for prompts, with sorted keys so equal data gives equal text"""
+    try:
+        return orjson.dumps(
+            obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+        ).decode()
+    except orjson.JSONEncodeError:
+        # e.g. integers beyond 64 bits, which only the stdlib encoder handles
+        return _stdlib_json.dumps(obj, indent=2, sort_keys=True)
+
+# Tokenizer used to budget prompts; cl100k_base is close enough to Llama's for a
+# pre-flight size check
+_TOKEN_ENCODING_NAME = "cl100k_base"
+
+@functools.lru_cache(maxsize=1)
+def _token_encoding():
+    import tiktoken
+    return tiktoken.get_encoding(_TOKEN_ENCODING_NAME)
+
+def _count_tokens(text: str) -> int:
+    return len(_token_encoding().encode_ordinary(text))
+
+@functools.lru_cache(maxsize=32)
+def _count_system_prompt_tokens(system_prompt: str) -> int:
+    return _count_tokens(system_prompt)
+
+# Classifies a stripped line of a markdown/prose response in one match; the
+# alternatives are tried in order, so earlier kinds take precedence
+_LINE_KIND_RE = re.compile(r'''
+    (?P<header>\#|(?:INTRODUCTION|OVERVIEW|FEATURES|DEMO|CONCLUSION)\Z)
+  | (?P<bullet>[-*])
+  | (?P<demo>.*?(?:demo|scenario))
+  | (?P<visual>.*?(?:diagram|chart|visual|image))
+''', re.IGNORECASE | re.VERBOSE)
+
+# Characters that matter when scanning for a balanced JSON object
+_JSON_SCAN_RE = re.compile(r'[{}"\\]')
+
+class _JsonObjectScanner:
+    """Finds the end of the first balanced {...} object in text fed chunk by chunk"""
+    
+    def __init__(self):
+        self.start = -1  # offset of the opening brace, -1 until one is seen
+        self._depth = 0
+        self._in_string = False
+        self._skip_to = 0  # offset after an escaped character
+        self._offset = 0  # offset of the next chunk
+    
+    def feed(self, chunk: str) -> int:
+        """Scan the next chunk; return the offset just past the closing brace, or -1"""
+        
+        base = self._offset
+        self._offset += len(chunk)
+        for match in _JSON_SCAN_RE.finditer(chunk):
+            pos = base + match.start()
+            if pos < self._skip_to:
+                continue
+            char = match.group()
+            if self.start < 0:
+                if char == '{':
+                    self.start = pos
+                    self._depth = 1
+            elif self._in_string:
+                if char == '\\':
+                    self._skip_to = pos + 2
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == '{':
+                self._depth += 1
+            elif char == '}':
+                self._depth -= 1
+                if self._depth == 0:
+                    return pos + 1
+        
+        return -1
+
+def _extract_json_object(text: str) -> Optional[str]:
+    """Return the first balanced {...} object in text, ignoring braces inside strings"""
+    
+    scanner = _JsonObjectScanner()
+    end = scanner.feed(text)
+    return text[scanner.start:end] if end >= 0 else None
+
+def _stream_chunk_text(chunk) -> str:
+    """Text carried by one streamed chunk (Llama API event or OpenAI-style delta)"""
+    
+    event = getattr(chunk, 'event', None)
+    if event is not None:
+        text = getattr(getattr(event, 'delta', None), 'text', None)
+        return text if isinstance(text, str) else ""
+    
+    choices = getattr(chunk, 'choices', None)
+    if choices:
+        return getattr(choices[0].delta, 'content', None) or ""
+    
+    return ""
+
+# Response headers carrying the requests left in the provider's current window
+_RATE_LIMIT_REMAINING_HEADERS = ("x-ratelimit-remaining-requests", "x-ratelimit-remaining")
+
+class _RateLimiter:
+    """Token bucket allowing bursts of up to `rate` requests and `rate` per `period` seconds"""
+    
+    def __init__(self, rate: int, period: float = 60.0):
+        self._capacity = float(rate)
+        self._fill_rate = rate / period
+        self._tokens = float(rate)
+        self._updated: Optional[float] = None
+    
+    async def acquire(self):
+        """Take one token, sleeping until it is available"""
+        
+        now = asyncio.get_running_loop().time()
+        if self._updated is not None:
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._fill_rate)
+        self._updated = now
+        
+        # A negative balance reserves the next tokens for waiters queued ahead
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self._fill_rate)
+    
+    def observe(self, headers):
+        """Shrink the bucket to the server's remaining request allowance, if it reports one
+        
+        Keeps the client from bursting into 429s when other processes share the key.
+        """
+        
+        for name in _RATE_LIMIT_REMAINING_HEADERS:
+            value = headers.get(name)
+            if value is not None:
+                try:
+                    self._tokens = min(self._tokens, float(value))
+                except ValueError:
+                    pass
+                return
+
+class CacheBackend(Protocol):
+    """Storage behind LLMCache; an in-process LRU by default, or a shared store such as Redis"""
+    
+    async def get(self, key: str) -> Optional[str]: ...
+    
+    async def set(self, key: str, value: str, ttl: Optional[float] = None) -> None: ...
+    
+    async def delete(self, key: str) -> None: ...
+
+class MemoryCacheBackend:
+    """In-process LRU store with optional per-entry expiry"""
+    
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        # key -> (value, monotonic expiry or None), least recently used first
+        self._entries: Dict[str, Tuple[str, Optional[float]]] = {}
+    
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            return None
+        self._entries[key] = entry  # mark as most recently used
+        return value
+    
+    async def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        self._entries.pop(key, None)
+        self._entries[key] = (value, time.monotonic() + ttl if ttl else None)
+        if len(self._entries) > self.max_size:
+            del self._entries[next(iter(self._entries))]
+    
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+    
+    def clear(self):
+        self._entries.clear()
+
+class SQLiteCacheBackend:
+    """On-disk store in SQLite (WAL mode), so cached responses survive restarts and are
+    shared between processes; calls run in a worker thread"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, response BLOB NOT NULL, created_at INTEGER NOT NULL, "
+                "expires_at REAL, hits INTEGER NOT NULL DEFAULT 0)"
+            )
+            self._conn = conn
+        return self._conn
+    
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT response, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            response, expires_at = row
+            if expires_at is not None and time.time() >= expires_at:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE llm_cache SET hits = hits + 1 WHERE key = ?", (key,))
+            return orjson.loads(response)
+    
+    def _set(self, key: str, value: str, ttl: Optional[float]):
+        now = time.time()
+        with self._lock:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, created_at, expires_at, hits) VALUES (?, ?, ?, ?, 0)",
+                (key, orjson.dumps(value), int(now), now + ttl if ttl else None)
+            )
+    
+    def _delete(self, key: str):
+        with self._lock:
+            self._connect().execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+    
+    async def get(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self._get, key)
+    
+    async def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        await asyncio.to_thread(self._set, key, value, ttl)
+    
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._delete, key)
+    
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+class TieredCacheBackend:
+    """Checks backends fastest first; a hit in a slower tier is copied into the faster ones"""
+    
+    def __init__(self, backends: Sequence[CacheBackend], fill_ttl: Optional[float] = None):
+        self.backends = list(backends)
+        self.fill_ttl = fill_ttl  # TTL for entries copied up from a slower tier
+    
+    async def get(self, key: str) -> Optional[str]:
+        for index, backend in enumerate(self.backends):
+            value = await backend.get(key)
+            if value is not None:
+                for faster in self.backends[:index]:
+                    await faster.set(key, value, ttl=self.fill_ttl)
+                return value
+        return None
+    
+    async def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        for backend in self.backends:
+            await backend.set(key, value, ttl=ttl)
+    
+    async def delete(self, key: str) -> None:
+        for backend in self.backends:
+            await backend.delete(key)
+    
+    def close(self):
+        for backend in self.backends:
+            close = getattr(backend, 'close', None)
+            if close:
+                close()
+
+class LLMCache:
+    """Exact-match response cache keyed by a SHA-256 of the request"""
+    
+    def __init__(self, backend: Optional[CacheBackend] = None, ttl: Optional[float] = 3600.0):
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.ttl = ttl
+        self.stats = {"hits": 0, "misses": 0}
+    
+    @staticmethod
+    def make_key(model: str, temperature: float, system_prompt: str, prompt: str, **options: Any) -> str:
+        """Hash everything that shapes the response; sorted keys keep it stable across runs"""
+        
+        payload = {
+            "model": model,
+            "temperature": temperature,
+            "system_prompt": system_prompt,
+            "prompt": prompt,
+            **options
+        }
+        return hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+    
+    async def get(self, key: str) -> Optional[str]:
+        value = await self.backend.get(key)
+        self.stats["hits" if value is not None else "misses"] += 1
+        return value
+    
+    async def set(self, key: str, value: str):
+        await self.backend.set(key, value, ttl=self.ttl)
+    
+    async def delete(self, key: str):
+        await self.backend.delete(key)
+
+class SemanticCache:
+    """Reuses the response of the most similar earlier prompt (cosine similarity of embeddings)
+    
+    `embed` is any async callable mapping text to a vector, e.g. an embeddings
+    endpoint. Entries are partitioned by scope so prompts are only matched against
+    others sent with the same model, system prompt and request options.
+    """
+    
+    def __init__(
+        self,
+        embed: Callable[[str], Awaitable[Sequence[float]]],
+        threshold: float = 0.92,
+        max_size: int = 256,
+        ttl: Optional[float] = 3600.0
+    ):
+        import numpy as np
+        
+        self._np = np
+        self.embed = embed
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = {"hits": 0, "misses": 0}
+        # entry id -> (scope, unit vector, response, monotonic expiry or None), least recently used first
+        self._entries: OrderedDict = OrderedDict()
+        self._next_id = 0
+        # scope -> (entry ids, stacked vectors), rebuilt after the scope changes
+        self._index: Dict[str, Tuple[List[int], Any]] = {}
+    
+    async def lookup(self, scope: str, prompt: str) -> Tuple[Any, Optional[str]]:
+        """Return the prompt's embedding and the cached response of its nearest match, if close enough"""
+        
+        vector = self._np.asarray(await self.embed(prompt), dtype=self._np.float32)
+        norm = self._np.linalg.norm(vector)
+        if norm:
+            vector = vector / norm
+        
+        ids, matrix = self._scope_index(scope)
+        if ids:
+            scores = matrix @ vector
+            best = int(scores.argmax())
+            if scores[best] > self.threshold:
+                entry_id = ids[best]
+                _, _, response, expires_at = self._entries[entry_id]
+                if expires_at is None or time.monotonic() < expires_at:
+                    self._entries.move_to_end(entry_id)
+                    self.stats["hits"] += 1
+                    return vector, response
+                self._remove(entry_id)
+        
+        self.stats["misses"] += 1
+        return vector, None
+    
+    def store(self, scope: str, vector: Any, response: str):
+        """Cache a response under the embedding returned by lookup"""
+        
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        self._entries[self._next_id] = (scope, vector, response, expires_at)
+        self._next_id += 1
+        self._index.pop(scope, None)
+        if len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+    
+    def _remove(self, entry_id: int):
+        scope = self._entries.pop(entry_id)[0]
+        self._index.pop(scope, None)
+    
+    def _scope_index(self, scope: str) -> Tuple[List[int], Any]:
+        index = self._index.get(scope)
+        if index is None:
+            ids = [entry_id for entry_id, entry in self._entries.items() if entry[0] == scope]
+            matrix = self._np.stack([self._entries[entry_id][1] for entry_id in ids]) if ids else None
+            index = self._index[scope] = (ids, matrix)
+        return index
 
 @dataclass
 class LlamaConfig:
@@ -20,6 +578,21 @@ class LlamaConfig:
     model: str = "Llama-4-Maverick-17B-128E-Instruct-FP8"
     max_tokens: int = 4096
     temperature: float = 0.7
+    # Opt-in: reusing responses for identical prompts also replays sampled output,
+    # so regenerating with the same inputs returns the cached script until it expires
+    enable_cache: bool = False
+    cache_size: int = 256
+    cache_ttl: Optional[float] = 3600.0  # seconds a cached response stays valid, None for no expiry
+    cache_path: Optional[str] = None  # SQLite file backing the cache across runs, None for memory only
+    max_connections: int = 64
+    max_keepalive: int = 32
+    keepalive_expiry: float = 60.0  # seconds an idle connection stays open
+    http_timeout: float = 120.0
+    context_window: Optional[int] = None  # prompt + completion tokens the model accepts (e.g. 128_000) to check prompts before sending; needs tiktoken
+    http2: bool = True  # multiplex requests over one connection when the h2 package is installed
+    max_concurrency: int = 16  # API requests in flight at once
+    max_retries: int = 5  # retries of connection errors, 429 and 5xx, with jittered backoff
+    requests_per_minute: Optional[int] = None  # client-side rate limit, None to disable
 
 class CodebaseContext(BaseModel):
     """Structured context from codebase analysis"""
@@ -35,6 +608,11 @@ class DocumentContext(BaseModel):
     requirements: List[Dict[str, Any]]
     summary: str
     total_requirements: int
+    
+    @functools.cached_property
+    def requirements_json(self) -> str:
+        """Requirements serialized for prompts, computed once per context"""
+        return _dumps_indented(self.requirements)
 
 class PresentationRequest(BaseModel):
     """Request for presentation generation"""
@@ -44,12 +622,176 @@ class PresentationRequest(BaseModel):
     focus_areas: List[str]
     demo_requirements: List[str]
 
+class ContextBuilder:
+    """Prompt builder for one codebase/document pair; the shared context prefix is built once"""
+    
+    def __init__(self, codebase_context: CodebaseContext, document_context: DocumentContext):
+        self.prefix = _SHARED_CONTEXT_TEMPLATE.substitute(
+            architecture=codebase_context.architecture,
+            main_features=', '.join(codebase_context.main_features),
+            dependencies=', '.join(codebase_context.dependencies),
+            key_components=', '.join(codebase_context.key_components),
+            user_flows=', '.join(codebase_context.user_flows),
+            filename=document_context.filename,
+            summary=document_context.summary,
+            total_requirements=document_context.total_requirements,
+            requirements=document_context.requirements_json
+        )
+    
+    @functools.cached_property
+    def prefix_tokens(self) -> int:
+        """Token count of the shared prefix, counted once"""
+        return _count_tokens(self.prefix)
+    
+    def prompt_tokens(self, prompt: str) -> int:
+        """Approximate token count of a prompt built by this builder"""
+        return self.prefix_tokens + _count_tokens(prompt[len(self.prefix):])
+    
+    def presentation_prompt(self, user_prompt: str, request: PresentationRequest) -> str:
+        """Build context for presentation generation"""
+        
+        return self.prefix + _PRESENTATION_CONTEXT_TEMPLATE.substitute(
+            user_prompt=user_prompt,
+            purpose=request.purpose,
+            audience=request.audience,
+            duration=request.duration,
+            focus_areas=', '.join(request.focus_areas),
+            demo_requirements=', '.join(request.demo_requirements)
+        )
+    
+    def agent_planning_prompt(self, user_prompt: str, presentation_script: Dict[str, Any]) -> str:
+        """Build context for agent execution planning"""
+        
+        return self.prefix + _AGENT_PLANNING_CONTEXT_TEMPLATE.substitute(
+            presentation_script=_dumps_indented(presentation_script),
+            user_prompt=user_prompt
+        )
+    
+    def user_prompt_context(self, user_prompt: str) -> str:
+        """Shared context followed by the user prompt alone"""
+        
+        return self.prefix + _USER_PROMPT_CONTEXT_TEMPLATE.substitute(user_prompt=user_prompt)
+
+class PresentationSection(BaseModel):
+    """One section of a generated presentation script"""
+    model_config = ConfigDict(extra='allow')
+    
+    title: str
+    duration: int
+    content: str
+    demo_trigger: Optional[str] = None
+    visual_cue: Optional[str] = None
+
+class PresentationScript(BaseModel):
+    """Presentation script in the JSON shape requested from Llama"""
+    model_config = ConfigDict(extra='allow')
+    
+    title: str
+    sections: List[PresentationSection]
+    total_duration: int
+    key_points: List[str]
+    demo_scenarios: List[str]
+    visual_elements: List[str]
+
+# Structured-output request so the model answers with a PresentationScript object
+_PRESENTATION_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "PresentationScript", "schema": PresentationScript.model_json_schema()}
+}
+
+class ExecutionStep(BaseModel):
+    """One step of an agent execution plan"""
+    model_config = ConfigDict(extra='allow')
+    
+    step: int
+    agent: str
+    action: str
+    duration: int
+    dependencies: List[str] = []
+
+class DemoScenarioPlan(BaseModel):
+    """Agent actions for one demo scenario"""
+    model_config = ConfigDict(extra='allow')
+    
+    name: str
+    browser_actions: List[str] = []
+    visual_triggers: List[str] = []
+    success_criteria: List[str] = []
+    error_handling: List[str] = []
+
+class TimingCoordination(BaseModel):
+    """Offsets (seconds) at which the avatar, demos and visuals are coordinated"""
+    model_config = ConfigDict(extra='allow')
+    
+    avatar_pauses: List[int] = []
+    demo_triggers: List[int] = []
+    visual_cues: List[int] = []
+
+class AgentExecutionPlan(BaseModel):
+    """Agent execution plan in the JSON shape requested from Llama"""
+    model_config = ConfigDict(extra='allow')
+    
+    agents_required: List[str]
+    execution_sequence: List[ExecutionStep]
+    demo_scenarios: List[DemoScenarioPlan]
+    timing_coordination: TimingCoordination
+
+_AGENT_PLAN_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "AgentExecutionPlan", "schema": AgentExecutionPlan.model_json_schema()}
+}
+
+_CONTEXT_BUILDER_CACHE_SIZE = 128
+
 class LlamaClient:
     """Main client for Llama 4 Maverick interactions"""
     
-    def __init__(self, config: LlamaConfig):
+    def __init__(
+        self,
+        config: LlamaConfig,
+        cache: Optional[LLMCache] = None,
+        semantic_cache: Optional[SemanticCache] = None
+    ):
+        import httpx
+        from llama_api_client import AsyncLlamaAPIClient
+        
         self.config = config
-        self.client = AsyncLlamaAPIClient(api_key=config.api_key)
+        # One pooled HTTP client so repeated calls reuse warm TLS connections;
+        # with HTTP/2, concurrent calls share a connection instead of opening more
+        self._http = httpx.AsyncClient(
+            http2=config.http2 and importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive,
+                keepalive_expiry=config.keepalive_expiry
+            ),
+            timeout=config.http_timeout
+        )
+        # The SDK retries transient failures itself, with jittered exponential
+        # backoff that honours Retry-After
+        self.client = AsyncLlamaAPIClient(
+            api_key=config.api_key,
+            http_client=self._http,
+            max_retries=config.max_retries
+        )
+        self._semaphore = asyncio.Semaphore(config.max_concurrency)
+        self._rate_limiter = _RateLimiter(config.requests_per_minute) if config.requests_per_minute else None
+        # Pass a cache to share it between clients or back it with another store
+        self._owns_cache = cache is None
+        if cache is None:
+            backend: CacheBackend = MemoryCacheBackend(config.cache_size)
+            if config.cache_path:
+                # Memory first, then the on-disk cache, then the network
+                backend = TieredCacheBackend(
+                    [backend, SQLiteCacheBackend(config.cache_path)], fill_ttl=config.cache_ttl
+                )
+            cache = LLMCache(backend, ttl=config.cache_ttl)
+        self.cache = cache
+        # Optional near-duplicate matching, consulted when the exact-match cache misses
+        self.semantic_cache = semantic_cache
+        self._inflight: Dict[str, asyncio.Future] = {}  # prompt hash -> request in progress
+        # (id(codebase), id(document)) -> (codebase, document, builder), least recently used first
+        self._context_builders: Dict[Tuple[int, int], Tuple[CodebaseContext, DocumentContext, ContextBuilder]] = {}
     
     async def generate_presentation_script(
         self, 
@@ -61,38 +803,16 @@ class LlamaClient:
         """Generate presentation script based on combined context"""
         
         # Build comprehensive context for Llama
-        context_prompt = self._build_presentation_context(
-            codebase_context, document_context, user_prompt, request
-        )
+        builder = self.context_builder(codebase_context, document_context)
+        context_prompt = builder.presentation_prompt(user_prompt, request)
+        self._ensure_prompt_fits(builder, context_prompt, _PRESENTATION_SYSTEM_PROMPT)
         
-        response = await self._call_llama(context_prompt, system_prompt="""
-        You are an expert presentation designer and technical communicator. Create compelling presentation scripts that:
-        1. Match the audience's technical level and interests
-        2. Highlight the most relevant features from the codebase
-        3. Tell a compelling story that connects requirements to implementation
-        4. Include specific demo scenarios with clear instructions
-        5. Provide timing and flow recommendations
-        
-        IMPORTANT: Return your response in valid JSON format with this structure:
-        {
-            "title": "Presentation Title",
-            "sections": [
-                {
-                    "title": "Section Title",
-                    "duration": 60,
-                    "content": "Detailed content for this section...",
-                    "demo_trigger": "trigger_name_or_null",
-                    "visual_cue": "visual_element_or_null"
-                }
-            ],
-            "total_duration": 300,
-            "key_points": ["Point 1", "Point 2", "Point 3"],
-            "demo_scenarios": ["Scenario 1", "Scenario 2"],
-            "visual_elements": ["Visual 1", "Visual 2"]
-        }
-        
-        Make the content specific to the provided codebase and requirements. Use the actual feature names, architecture details, and requirements from the context.
-        """)
+        response = await self._call_llama(
+            context_prompt,
+            system_prompt=_PRESENTATION_SYSTEM_PROMPT,
+            stop_at_json=True,
+            response_format=_PRESENTATION_RESPONSE_FORMAT
+        )
         
         return self._parse_presentation_script(response)
     
@@ -105,159 +825,202 @@ class LlamaClient:
     ) -> Dict[str, Any]:
         """Generate agent execution plan for demo orchestration"""
         
-        context_prompt = self._build_agent_planning_context(
-            codebase_context, document_context, user_prompt, presentation_script
-        )
-        
-        response = await self._call_llama(context_prompt, system_prompt="""
-        You are an expert in software demos and agent orchestration. Create detailed agent execution plans that:
-        1. Define which agents are needed for each demo scenario
-        2. Specify the sequence and timing of agent actions
-        3. Include browser automation instructions
-        4. Define success criteria and error handling
-        5. Coordinate with avatar presentation timing
-        6. Plan visual generation and display
+        builder = self.context_builder(codebase_context, document_context)
+        context_prompt = builder.agent_planning_prompt(user_prompt, presentation_script)
+        self._ensure_prompt_fits(builder, context_prompt, _AGENT_PLAN_SYSTEM_PROMPT)
         
-        Provide structured, executable plans that can be used by automation systems.
-        """)
+        response = await self._call_llama(
+            context_prompt,
+            system_prompt=_AGENT_PLAN_SYSTEM_PROMPT,
+            stop_at_json=True,
+            response_format=_AGENT_PLAN_RESPONSE_FORMAT
+        )
         
         return self._parse_agent_execution_plan(response)
     
-    async def _call_llama(self, prompt: str, system_prompt: str = "") -> str:
-        """Make API call to Llama 4 Maverick using the working client"""
-        
-        messages = []
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        messages.append({"role": "user", "content": prompt})
-        
-        try:
-            response = await self.client.chat.completions.create(
-                model=self.config.model,
-                messages=messages
-            )
-            
-            # Extract the text content from the response
-            if hasattr(response, 'choices') and len(response.choices) > 0:
-                choice = response.choices[0]
-                if hasattr(choice, 'message') and hasattr(choice.message, 'content'):
-                    return choice.message.content
-            
-            # If response structure is different, try to extract content
-            if hasattr(response, 'completion_message'):
-                completion = response.completion_message
-                if hasattr(completion, 'content'):
-                    content = completion.content
-                    if hasattr(content, 'text'):
-                        return content.text
-                    elif isinstance(content, str):
-                        return content
-            
-            # Fallback: return the full response if we can't extract content
-            return str(response)
-            
-        except Exception as e:
-            raise Exception(f"Llama API call failed: {str(e)}")
-    
-    def _build_presentation_context(
-        self, 
-        codebase_context: CodebaseContext,
-        document_context: DocumentContext,
-        user_prompt: str,
-        request: PresentationRequest
+    async def _call_llama(
+        self,
+        prompt: str,
+        system_prompt: str = "",
+        stop_at_json: bool = False,
+        response_format: Optional[Dict[str, Any]] = None
     ) -> str:
-        """Build comprehensive context for presentation generation"""
+        """Make API call to Llama 4 Maverick, reusing cached responses for repeated
+        prompts when enable_cache is set"""
         
-        return f"""
-        Generate a compelling presentation script based on the following detailed context:
-        
-        === USER PROMPT ===
-        {user_prompt}
-        
-        === PRESENTATION REQUEST ===
-        Purpose: {request.purpose}
-        Audience: {request.audience}
-        Duration: {request.duration} minutes
-        Focus Areas: {', '.join(request.focus_areas)}
-        Demo Requirements: {', '.join(request.demo_requirements)}
+        cache_key = LLMCache.make_key(
+            self.config.model,
+            self.config.temperature,
+            system_prompt,
+            prompt,
+            stop_at_json=stop_at_json,
+            response_format=response_format
+        )
+        if self.config.enable_cache:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return cached
         
-        === CODEBASE ANALYSIS ===
-        Architecture: {codebase_context.architecture}
-        Main Features: {', '.join(codebase_context.main_features)}
-        Dependencies: {', '.join(codebase_context.dependencies)}
-        Key Components: {', '.join(codebase_context.key_components)}
-        User Flows: {', '.join(codebase_context.user_flows)}
+        use_semantic = self.config.enable_cache and self.semantic_cache is not None
+        if use_semantic:
+            # Same hash without the prompt: near matches must share everything else
+            semantic_scope = LLMCache.make_key(
+                self.config.model,
+                self.config.temperature,
+                system_prompt,
+                "",
+                stop_at_json=stop_at_json,
+                response_format=response_format
+            )
+            embedding, cached = await self.semantic_cache.lookup(semantic_scope, prompt)
+            if cached is not None:
+                return cached
         
-        === REQUIREMENTS DOCUMENT ===
-        Document: {document_context.filename}
-        Summary: {document_context.summary}
-        Total Requirements: {document_context.total_requirements}
+        # Identical prompts already on the wire share that request instead of sending another
+        pending = self._inflight.get(cache_key)
+        sent_here = pending is None
+        if sent_here:
+            pending = asyncio.ensure_future(
+                self._request_completion(prompt, system_prompt, stop_at_json, response_format)
+            )
+            self._inflight[cache_key] = pending
+            pending.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
         
-        Requirements Details:
-        {json.dumps(document_context.requirements, indent=2)}
+        # Shielded so one caller being cancelled doesn't cancel the request for the others
+        response_text = await asyncio.shield(pending)
         
-        INSTRUCTIONS:
-        1. Use the ACTUAL feature names, architecture, and requirements from the context above
-        2. Create sections that specifically address the documented requirements
-        3. Reference the real codebase features and components
-        4. Make demo scenarios based on the actual user flows and features
-        5. Tailor the content to the specified audience and purpose
-        6. Include specific timing that fits within the {request.duration} minute duration
-        7. Create visual elements that would help explain the actual architecture and features
+        if self.config.enable_cache:
+            await self.cache.set(cache_key, response_text)
+        if use_semantic and sent_here:
+            self.semantic_cache.store(semantic_scope, embedding, response_text)
         
-        Return your response in valid JSON format as specified in the system prompt.
-        """
+        return response_text
     
-    def _build_agent_planning_context(
+    async def _request_completion(
         self,
-        codebase_context: CodebaseContext,
-        document_context: DocumentContext,
-        user_prompt: str,
-        presentation_script: Dict[str, Any]
+        prompt: str,
+        system_prompt: str,
+        stop_at_json: bool = False,
+        response_format: Optional[Dict[str, Any]] = None
     ) -> str:
-        """Build context for agent execution planning"""
+        """Stream one chat completion and return its text
         
-        return f"""
-        Create an agent execution plan for the following presentation:
+        With stop_at_json the stream is closed as soon as the first balanced JSON
+        object has arrived; otherwise the whole completion is read.
+        """
         
-        === USER PROMPT ===
-        {user_prompt}
+        parts = []
+        scanner = _JsonObjectScanner() if stop_at_json else None
+        chunks = self._call_llama_streaming(prompt, system_prompt, response_format)
+        try:
+            async for text in chunks:
+                parts.append(text)
+                if scanner and scanner.feed(text) >= 0:
+                    break
+        finally:
+            await chunks.aclose()
         
-        === CODEBASE CONTEXT ===
-        Architecture: {codebase_context.architecture}
-        Main Features: {', '.join(codebase_context.main_features)}
-        Key Components: {', '.join(codebase_context.key_components)}
+        return "".join(parts)
+    
+    async def _call_llama_streaming(
+        self,
+        prompt: str,
+        system_prompt: str = "",
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """Yield the completion text as it arrives, without caching"""
         
-        === PRESENTATION SCRIPT ===
-        {json.dumps(presentation_script, indent=2)}
+        user_message = {"role": "user", "content": prompt}
+        messages = [_system_message(system_prompt), user_message] if system_prompt else [user_message]
         
-        === REQUIREMENTS CONTEXT ===
-        Document: {document_context.filename}
-        Requirements: {json.dumps(document_context.requirements, indent=2)}
+        # Hold a concurrency slot only while the request is on the wire
+        async with self._semaphore:
+            if self._rate_limiter:
+                await self._rate_limiter.acquire()
+            try:
+                extra_args = {"response_format": response_format} if response_format else {}
+                stream = await self.client.chat.completions.create(
+                    model=self.config.model,
+                    messages=messages,
+                    stream=True,
+                    **extra_args
+                )
+            except Exception as e:
+                raise Exception(f"Llama API call failed: {str(e)}")
+            
+            if self._rate_limiter:
+                response = getattr(stream, 'response', None)
+                if response is not None:
+                    self._rate_limiter.observe(response.headers)
+            
+            # Closed however the consumer stops: exhausted, break/aclose() or an error
+            try:
+                async for chunk in stream:
+                    text = _stream_chunk_text(chunk)
+                    if text:
+                        yield text
+            except Exception as e:
+                raise Exception(f"Llama API call failed: {str(e)}")
+            finally:
+                await stream.close()
+    
+    def context_builder(
+        self,
+        codebase_context: CodebaseContext,
+        document_context: DocumentContext
+    ) -> ContextBuilder:
+        """Return the builder for a codebase/document pair, reusing it across calls"""
         
-        Create a detailed agent execution plan that:
-        1. Defines which agents (browser automation, visual generation, etc.) are needed
-        2. Specifies the exact sequence and timing of actions
-        3. Includes precise browser automation instructions
-        4. Defines success criteria and error handling
-        5. Coordinates with avatar presentation timing
-        6. Plans visual generation and display timing
+        # Entries hold the contexts themselves, so their ids can't be reused while cached
+        key = (id(codebase_context), id(document_context))
+        entry = self._context_builders.pop(key, None)
+        if entry is None:
+            entry = (codebase_context, document_context, ContextBuilder(codebase_context, document_context))
+        self._context_builders[key] = entry  # most recently used last
+        if len(self._context_builders) > _CONTEXT_BUILDER_CACHE_SIZE:
+            del self._context_builders[next(iter(self._context_builders))]
+        return entry[2]
+    
+    def _prompt_budget(self, system_prompt: str) -> Optional[int]:
+        """Prompt tokens that fit beside the system prompt and a max_tokens completion
+        (None when the context window isn't checked)"""
         
-        Focus on creating executable, step-by-step instructions for each demo scenario.
-        """
+        if self.config.context_window is None:
+            return None
+        return (
+            self.config.context_window
+            - self.config.max_tokens
+            - _count_system_prompt_tokens(system_prompt)
+        )
+    
+    def _ensure_prompt_fits(self, builder: ContextBuilder, prompt: str, system_prompt: str):
+        """Fail before sending a prompt the model can't accept, instead of after a round trip"""
+        
+        budget = self._prompt_budget(system_prompt)
+        if budget is None:
+            return
+        prompt_tokens = builder.prompt_tokens(prompt)
+        if prompt_tokens > budget:
+            raise ValueError(
+                f"Prompt is about {prompt_tokens} tokens but only {budget} fit in the "
+                f"{self.config.context_window}-token context window; shorten the requirements "
+                f"document or user prompt, or raise LlamaConfig.context_window"
+            )
     
     def _parse_presentation_script(self, response: str) -> Dict[str, Any]:
         """Parse Llama response into structured presentation script"""
         
+        # Structured output: the response is the script itself
         try:
-            # First, try to extract JSON from the response
-            import re
-            
-            # Look for JSON in the response
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-                parsed_response = json.loads(json_str)
+            return PresentationScript.model_validate_json(response).model_dump()
+        except ValidationError:
+            pass
+        
+        try:
+            # Otherwise, try to extract JSON from the response
+            json_str = _extract_json_object(response)
+            if json_str:
+                parsed_response = orjson.loads(json_str)
                 return parsed_response
             
             # If no JSON found, try to parse the response as markdown or text
@@ -274,39 +1037,46 @@ class LlamaClient:
                 if not line:
                     continue
                 
+                match = _LINE_KIND_RE.match(line)
+                kind = match.lastgroup if match else None
+                
                 # Look for section headers
-                if line.startswith('#') or line.upper() in ['INTRODUCTION', 'OVERVIEW', 'FEATURES', 'DEMO', 'CONCLUSION']:
+                if kind == 'header':
                     if current_section:
                         sections.append(current_section)
                     
                     current_section = {
                         "title": line.lstrip('#').strip(),
                         "duration": 60,  # Default duration
-                        "content": "",
+                        "content": [],  # lines, joined once parsing is done
                         "demo_trigger": None,
                         "visual_cue": None
                     }
                 
                 # Look for key points
-                elif line.startswith('-') or line.startswith('*'):
+                elif kind == 'bullet':
                     key_points.append(line.lstrip('-* ').strip())
                 
                 # Look for demo scenarios
-                elif 'demo' in line.lower() or 'scenario' in line.lower():
+                elif kind == 'demo':
                     demo_scenarios.append(line.strip())
                 
                 # Look for visual elements
-                elif any(word in line.lower() for word in ['diagram', 'chart', 'visual', 'image']):
+                elif kind == 'visual':
                     visual_elements.append(line.strip())
                 
                 # Add content to current section
                 elif current_section:
-                    current_section["content"] += line + "\n"
+                    current_section["content"].append(line)
             
             # Add the last section
             if current_section:
                 sections.append(current_section)
             
+            for section in sections:
+                content_lines = section["content"]
+                section["content"] = "\n".join(content_lines) + "\n" if content_lines else ""
+            
             # If no sections found, create a default structure
             if not sections:
                 sections = [
@@ -356,50 +1126,21 @@ class LlamaClient:
     def _parse_agent_execution_plan(self, response: str) -> Dict[str, Any]:
         """Parse Llama response into structured agent execution plan"""
         
-        # For now, return a structured format
-        # In production, you'd parse the response more intelligently
-        return {
-            "agents_required": ["browser_automator", "visual_generator", "tavus_coordinator"],
-            "execution_sequence": [
-                {
-                    "step": 1,
-                    "agent": "tavus_coordinator",
-                    "action": "start_presentation",
-                    "duration": 30,
-                    "dependencies": []
-                },
-                {
-                    "step": 2,
-                    "agent": "browser_automator",
-                    "action": "navigate_to_app",
-                    "duration": 10,
-                    "dependencies": ["tavus_coordinator"]
-                },
-                {
-                    "step": 3,
-                    "agent": "visual_generator",
-                    "action": "show_architecture_diagram",
-                    "duration": 15,
-                    "dependencies": ["browser_automator"]
-                }
-            ],
-            "demo_scenarios": [
-                {
-                    "name": "Feature Demo 1",
-                    "browser_actions": ["click_button", "fill_form", "verify_result"],
-                    "visual_triggers": ["show_diagram", "highlight_feature"],
-                    "success_criteria": ["page_loaded", "feature_visible"],
-                    "error_handling": ["retry_action", "show_fallback"]
-                }
-            ],
-            "timing_coordination": {
-                "avatar_pauses": [60, 180, 300],
-                "demo_triggers": [90, 210, 330],
-                "visual_cues": [75, 195, 315]
-            }
-        }
+        # Structured output: the response is the plan itself; otherwise look for
+        # a plan object inside the text
+        for candidate in (response, _extract_json_object(response)):
+            if candidate:
+                try:
+                    return AgentExecutionPlan.model_validate_json(candidate).model_dump()
+                except ValidationError:
+                    pass
+        
+        # No usable plan: fall back to the default, shared plan (read-only for callers)
+        return _DEFAULT_AGENT_EXECUTION_PLAN
     
     async def close(self):
-        """Close the client"""
-        # The AsyncLlamaAPIClient doesn't need explicit closing
-        pass 
\ No newline at end of file
+        """Close the client, its pooled connections and the cache it created"""
+        await self._http.aclose()
+        close_cache = getattr(self.cache.backend, 'close', None)
+        if self._owns_cache and close_cache:
+            close_cache() 
\ No newline at end of file
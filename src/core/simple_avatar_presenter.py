@@ -3,12 +3,108 @@
 Simple Avatar Presenter - Shows Tavus avatar reading scripts with natural pauses
 """
 
+import html
 import json
 import time
-from typing import Dict, Any, List
+from string import Template
+from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 
-@dataclass
+# Phrases after which the avatar pauses: introductions, demo lead-ins and section ends
+_PAUSE_PHRASES = (
+    'welcome', 'hello', 'thank you',
+    'let me show you', 'now let\'s', 'let\'s look at', 'here\'s how',
+    'that concludes', 'in summary', 'to summarize'
+)
+
+# Gesture phrases, checked in order: (phrases, gesture)
+_GESTURES = (
+    (('welcome', 'hello', 'thank you'), "welcome_gesture"),
+    (('let me show you', 'here\'s how', 'as you can see'), "point_at_screen"),
+    (('important', 'key', 'critical'), "emphasize_gesture"),
+    (('in conclusion', 'to summarize', 'finally'), "conclusion_gesture"),
+)
+
+# Tavus player embed with presentation controls; the $ fields are filled in by
+# generate_embed_code, JS template literals escape $ as $$
+_EMBED_TEMPLATE = Template("""
+        <div id="tavus-player-container" style="width: 100%; height: 500px; border: 2px solid #667eea; border-radius: 10px; overflow: hidden; margin: 20px 0;">
+            <iframe 
+                src="https://app.tavus.com/embed/$pid"
+                width="100%" 
+                height="100%" 
+                frameborder="0"
+                allowfullscreen>
+            </iframe>
+        </div>
+        
+        <div id="presentation-controls" style="margin: 20px 0;">
+            <button onclick="startPresentation()" style="background: #667eea; color: white; border: none; padding: 10px 20px; border-radius: 5px; cursor: pointer; margin-right: 10px;">
+                🎬 Start Presentation
+            </button>
+            <button onclick="pausePresentation()" style="background: #f39c12; color: white; border: none; padding: 10px 20px; border-radius: 5px; cursor: pointer; margin-right: 10px;">
+                ⏸️ Pause
+            </button>
+            <button onclick="stopPresentation()" style="background: #e74c3c; color: white; border: none; padding: 10px 20px; border-radius: 5px; cursor: pointer;">
+                ⏹️ Stop
+            </button>
+        </div>
+        
+        <div id="presentation-status" style="background: #f8f9fa; padding: 15px; border-radius: 5px; margin: 20px 0;">
+            <h4>📊 Presentation Status</h4>
+            <p><strong>Total Segments:</strong> $segment_count</p>
+            <p><strong>Total Duration:</strong> $total_duration seconds</p>
+            <p><strong>Natural Pauses:</strong> $pause_count</p>
+        </div>
+        
+        <script>
+            // Presentation control functions
+            function startPresentation() {
+                console.log('🎬 Starting avatar presentation...');
+                document.getElementById('presentation-status').innerHTML += '<p style="color: green;">✅ Presentation started</p>';
+                
+                // Simulate segment progression
+                const segments = $segments;
+                let currentSegment = 0;
+                
+                const progressInterval = setInterval(() => {
+                    if (currentSegment < segments.length) {
+                        const segment = segments[currentSegment];
+                        console.log(`Segment $${currentSegment + 1}: $${segment.text.substring(0, 50)}...`);
+                        
+                        // Update status
+                        document.getElementById('presentation-status').innerHTML += 
+                            `<p style="color: #667eea;">🎭 Segment $${currentSegment + 1}: $${segment.text.substring(0, 50)}...</p>`;
+                        
+                        // Add pause indicator if needed
+                        if (segment.pause_after) {
+                            setTimeout(() => {
+                                document.getElementById('presentation-status').innerHTML += 
+                                    '<p style="color: #f39c12;">⏸️ Natural pause...</p>';
+                            }, segment.duration * 1000);
+                        }
+                        
+                        currentSegment++;
+                    } else {
+                        clearInterval(progressInterval);
+                        document.getElementById('presentation-status').innerHTML += '<p style="color: green;">🎉 Presentation completed!</p>';
+                    }
+                }, 3000); // Update every 3 seconds for demo
+            }
+            
+            function pausePresentation() {
+                console.log('⏸️ Pausing presentation...');
+                document.getElementById('presentation-status').innerHTML += '<p style="color: #f39c12;">⏸️ Presentation paused</p>';
+            }
+            
+            function stopPresentation() {
+                console.log('⏹️ Stopping presentation...');
+                document.getElementById('presentation-status').innerHTML += '<p style="color: #e74c3c;">⏹️ Presentation stopped</p>';
+            }
+        </script>
+        """)
+
+@dataclass(slots=True, frozen=True)
 class AvatarSegment:
     """Represents a segment of avatar presentation"""
     id: str
@@ -24,75 +120,92 @@ class SimpleAvatarPresenter:
         self.segments: List[AvatarSegment] = []
         self.current_segment = 0
         self.is_presenting = False
+        # Totals over self.segments, kept up to date as segments are added
+        self._total_duration = 0
+        self._pause_count = 0
+        self._segments_json: Optional[str] = None  # avatar script segments for the embed
         
     def load_script(self, presentation_script: str, demo_plan: Dict[str, Any] = None):
         """Load and segment the presentation script"""
         
-        self.segments = []
+        self._reset_segments()
         
         # Split script into natural segments
         script_segments = self._split_script_into_segments(presentation_script)
         
         # Create avatar segments with timing
         for i, segment_text in enumerate(script_segments):
-            # Estimate duration based on word count (average 150 words per minute)
-            word_count = len(segment_text.split())
-            duration = max(3.0, (word_count / 150) * 60)  # Minimum 3 seconds
-            
-            # Add pauses after certain segments
-            pause_after = self._should_pause_after(segment_text, i, len(script_segments))
-            
-            # Determine gesture based on content
-            gesture = self._get_gesture_for_segment(segment_text)
-            
-            segment = AvatarSegment(
-                id=f"segment_{i+1}",
-                text=segment_text.strip(),
-                duration=duration,
-                pause_after=pause_after,
-                gesture=gesture
-            )
-            
-            self.segments.append(segment)
+            self._append_segment(i, segment_text, len(script_segments))
+    
+    def _reset_segments(self):
+        self.segments = []
+        self._total_duration = 0
+        self._pause_count = 0
+        self._segments_json = None
+    
+    def _append_segment(self, i: int, segment_text: str, total_segments: int) -> AvatarSegment:
+        """Create segment i with timing, pause and gesture"""
+        
+        # Estimate duration based on word count (average 150 words per minute)
+        word_count = len(segment_text.split())
+        duration = max(3.0, (word_count / 150) * 60)  # Minimum 3 seconds
+        
+        # Add pauses after certain segments
+        pause_after = self._should_pause_after(segment_text, i, total_segments)
+        
+        # Determine gesture based on content
+        gesture = self._get_gesture_for_segment(segment_text)
+        
+        segment = AvatarSegment(
+            id=f"segment_{i+1}",
+            text=segment_text.strip(),
+            duration=duration,
+            pause_after=pause_after,
+            gesture=gesture
+        )
+        
+        self.segments.append(segment)
+        self._total_duration += duration
+        self._pause_count += pause_after
+        self._segments_json = None
+        return segment
     
     def _split_script_into_segments(self, script: str) -> List[str]:
         """Split script into natural speaking segments"""
         
-        # Split by sentences and paragraphs
         segments = []
         
-        # Split by double newlines (paragraphs)
-        paragraphs = script.split('\n\n')
-        
-        for paragraph in paragraphs:
-            if not paragraph.strip():
-                continue
-                
-            # Split long paragraphs into sentences
-            sentences = paragraph.split('. ')
+        # Split by double newlines (paragraphs), then into sentences
+        for paragraph in script.split('\n\n'):
+            current_parts: List[str] = []
+            current_length = 0  # length of " ".join(current_parts)
             
-            current_segment = ""
-            for sentence in sentences:
+            for sentence in paragraph.split('. '):
                 if not sentence.strip():
                     continue
-                    
+                
                 # Add period back if it was removed
                 if not sentence.endswith('.'):
                     sentence += '.'
                 
                 # If adding this sentence would make segment too long, start new segment
-                if len(current_segment + sentence) > 200:  # Max ~200 chars per segment
-                    if current_segment:
-                        segments.append(current_segment.strip())
-                        current_segment = sentence
+                if current_length + len(sentence) > 200:  # Max ~200 chars per segment
+                    if current_parts:
+                        segments.append(" ".join(current_parts).strip())
+                        current_parts = [sentence]
+                        current_length = len(sentence)
                     else:
                         segments.append(sentence)
+                elif current_parts:
+                    current_parts.append(sentence)
+                    current_length += 1 + len(sentence)
                 else:
-                    current_segment += " " + sentence if current_segment else sentence
+                    current_parts = [sentence]
+                    current_length = len(sentence)
             
             # Add remaining segment
-            if current_segment:
-                segments.append(current_segment.strip())
+            if current_parts:
+                segments.append(" ".join(current_parts).strip())
         
         return segments
     
@@ -101,17 +214,10 @@ class SimpleAvatarPresenter:
         
         text_lower = segment_text.lower()
         
-        # Pause after introductions
-        if any(phrase in text_lower for phrase in ['welcome', 'hello', 'thank you']):
-            return True
-        
-        # Pause before demo sections
-        if any(phrase in text_lower for phrase in ['let me show you', 'now let\'s', 'let\'s look at', 'here\'s how']):
-            return True
-        
-        # Pause after major sections
-        if any(phrase in text_lower for phrase in ['that concludes', 'in summary', 'to summarize']):
-            return True
+        # Pause after introductions, before demo sections and after major sections
+        for phrase in _PAUSE_PHRASES:
+            if phrase in text_lower:
+                return True
         
         # Pause every 3-4 segments for natural flow
         if (index + 1) % 3 == 0 and index < total_segments - 1:
@@ -124,30 +230,26 @@ class SimpleAvatarPresenter:
         
         text_lower = segment_text.lower()
         
-        if any(phrase in text_lower for phrase in ['welcome', 'hello', 'thank you']):
-            return "welcome_gesture"
-        elif any(phrase in text_lower for phrase in ['let me show you', 'here\'s how', 'as you can see']):
-            return "point_at_screen"
-        elif any(phrase in text_lower for phrase in ['important', 'key', 'critical']):
-            return "emphasize_gesture"
-        elif any(phrase in text_lower for phrase in ['in conclusion', 'to summarize', 'finally']):
-            return "conclusion_gesture"
-        else:
-            return "neutral_gesture"
+        for phrases, gesture in _GESTURES:
+            for phrase in phrases:
+                if phrase in text_lower:
+                    return gesture
+        
+        return "neutral_gesture"
     
     def generate_avatar_script(self) -> Dict[str, Any]:
         """Generate the avatar script for Tavus"""
         
-        avatar_segments = []
-        
-        for segment in self.segments:
-            avatar_segments.append({
+        avatar_segments = [
+            {
                 "id": segment.id,
                 "text": segment.text,
                 "duration": segment.duration,
                 "gesture": segment.gesture,
                 "pause_after": segment.pause_after
-            })
+            }
+            for segment in self.segments
+        ]
         
         return {
             "avatar_config": {
@@ -160,9 +262,9 @@ class SimpleAvatarPresenter:
                 "segments": avatar_segments
             },
             "timing": {
-                "total_duration": sum(seg.duration for seg in self.segments),
+                "total_duration": self._total_duration,
                 "segment_count": len(self.segments),
-                "pause_count": sum(1 for seg in self.segments if seg.pause_after)
+                "pause_count": self._pause_count
             }
         }
     
@@ -170,83 +272,19 @@ class SimpleAvatarPresenter:
         """Generate HTML embed code for Tavus player"""
         
         avatar_script = self.generate_avatar_script()
+        timing = avatar_script['timing']
         
-        return f"""
-        <div id="tavus-player-container" style="width: 100%; height: 500px; border: 2px solid #667eea; border-radius: 10px; overflow: hidden; margin: 20px 0;">
-            <iframe 
-                src="https://app.tavus.com/embed/{presentation_id}"
-                width="100%" 
-                height="100%" 
-                frameborder="0"
-                allowfullscreen>
-            </iframe>
-        </div>
+        if self._segments_json is None:
+            # "</" is escaped so segment text can't close the <script> element early
+            self._segments_json = json.dumps(avatar_script['presentation']['segments']).replace('</', '<\\/')
         
-        <div id="presentation-controls" style="margin: 20px 0;">
-            <button onclick="startPresentation()" style="background: #667eea; color: white; border: none; padding: 10px 20px; border-radius: 5px; cursor: pointer; margin-right: 10px;">
-                🎬 Start Presentation
-            </button>
-            <button onclick="pausePresentation()" style="background: #f39c12; color: white; border: none; padding: 10px 20px; border-radius: 5px; cursor: pointer; margin-right: 10px;">
-                ⏸️ Pause
-            </button>
-            <button onclick="stopPresentation()" style="background: #e74c3c; color: white; border: none; padding: 10px 20px; border-radius: 5px; cursor: pointer;">
-                ⏹️ Stop
-            </button>
-        </div>
-        
-        <div id="presentation-status" style="background: #f8f9fa; padding: 15px; border-radius: 5px; margin: 20px 0;">
-            <h4>📊 Presentation Status</h4>
-            <p><strong>Total Segments:</strong> {avatar_script['timing']['segment_count']}</p>
-            <p><strong>Total Duration:</strong> {avatar_script['timing']['total_duration']:.1f} seconds</p>
-            <p><strong>Natural Pauses:</strong> {avatar_script['timing']['pause_count']}</p>
-        </div>
-        
-        <script>
-            // Presentation control functions
-            function startPresentation() {{
-                console.log('🎬 Starting avatar presentation...');
-                document.getElementById('presentation-status').innerHTML += '<p style="color: green;">✅ Presentation started</p>';
-                
-                // Simulate segment progression
-                const segments = {json.dumps(avatar_script['presentation']['segments'])};
-                let currentSegment = 0;
-                
-                const progressInterval = setInterval(() => {{
-                    if (currentSegment < segments.length) {{
-                        const segment = segments[currentSegment];
-                        console.log(`Segment ${{currentSegment + 1}}: ${{segment.text.substring(0, 50)}}...`);
-                        
-                        // Update status
-                        document.getElementById('presentation-status').innerHTML += 
-                            `<p style="color: #667eea;">🎭 Segment ${{currentSegment + 1}}: ${{segment.text.substring(0, 50)}}...</p>`;
-                        
-                        // Add pause indicator if needed
-                        if (segment.pause_after) {{
-                            setTimeout(() => {{
-                                document.getElementById('presentation-status').innerHTML += 
-                                    '<p style="color: #f39c12;">⏸️ Natural pause...</p>';
-                            }}, segment.duration * 1000);
-                        }}
-                        
-                        currentSegment++;
-                    }} else {{
-                        clearInterval(progressInterval);
-                        document.getElementById('presentation-status').innerHTML += '<p style="color: green;">🎉 Presentation completed!</p>';
-                    }}
-                }}, 3000); // Update every 3 seconds for demo
-            }}
-            
-            function pausePresentation() {{
-                console.log('⏸️ Pausing presentation...');
-                document.getElementById('presentation-status').innerHTML += '<p style="color: #f39c12;">⏸️ Presentation paused</p>';
-            }}
-            
-            function stopPresentation() {{
-                console.log('⏹️ Stopping presentation...');
-                document.getElementById('presentation-status').innerHTML += '<p style="color: #e74c3c;">⏹️ Presentation stopped</p>';
-            }}
-        </script>
-        """
+        return _EMBED_TEMPLATE.substitute(
+            pid=html.escape(presentation_id),
+            segment_count=timing['segment_count'],
+            total_duration=f"{timing['total_duration']:.1f}",
+            pause_count=timing['pause_count'],
+            segments=self._segments_json
+        )
     
     def get_presentation_summary(self) -> Dict[str, Any]:
         """Get summary of the presentation"""
@@ -254,14 +292,11 @@ class SimpleAvatarPresenter:
         if not self.segments:
             return {"error": "No script loaded"}
         
-        total_duration = sum(seg.duration for seg in self.segments)
-        pause_count = sum(1 for seg in self.segments if seg.pause_after)
-        
         return {
             "segment_count": len(self.segments),
-            "total_duration": total_duration,
-            "average_segment_duration": total_duration / len(self.segments),
-            "pause_count": pause_count,
+            "total_duration": self._total_duration,
+            "average_segment_duration": self._total_duration / len(self.segments),
+            "pause_count": self._pause_count,
             "segments": [
                 {
                     "id": seg.id,
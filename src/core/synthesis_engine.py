@@ -2,7 +2,6 @@
 Synthesis Engine - Combines codebase analysis, document parsing, and user prompt for Llama processing
 """
 
-import json
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 from src.analysis.document_parser import ParsedDocument
@@ -80,26 +79,13 @@ class SynthesisEngine:
         return " | ".join(summary_parts)
     
     def prepare_llama_context(self, synthesis_input: SynthesisInput) -> str:
-        """Prepare comprehensive context for Llama processing"""
+        """Prepare comprehensive context for Llama processing
         
-        context_parts = [
-            "=== USER PROMPT ===",
-            synthesis_input.user_prompt,
-            "",
-            "=== CODEBASE ANALYSIS ===",
-            f"Architecture: {synthesis_input.codebase_context.architecture}",
-            f"Main Features: {', '.join(synthesis_input.codebase_context.main_features)}",
-            f"Dependencies: {', '.join(synthesis_input.codebase_context.dependencies)}",
-            f"Key Components: {', '.join(synthesis_input.codebase_context.key_components)}",
-            f"User Flows: {', '.join(synthesis_input.codebase_context.user_flows)}",
-            "",
-            "=== REQUIREMENTS DOCUMENT ===",
-            f"Document: {synthesis_input.document_context.filename}",
-            f"Summary: {synthesis_input.document_context.summary}",
-            f"Total Requirements: {synthesis_input.document_context.total_requirements}",
-            "",
-            "=== REQUIREMENTS DETAILS ===",
-            json.dumps(synthesis_input.document_context.requirements, indent=2)
-        ]
+        Uses the client's shared context prefix, so it matches the start of the
+        prompts sent by generate_presentation_script and generate_agent_execution_plan.
+        """
         
-        return "\n".join(context_parts) 
\ No newline at end of file
+        builder = self.llama_client.context_builder(
+            synthesis_input.codebase_context, synthesis_input.document_context
+        )
+        return builder.user_prompt_context(synthesis_input.user_prompt)
@@ -6,13 +6,44 @@ Tavus Avatar Controller - Orchestrates avatar presentations with demo synchroniz
 import os
 import json
 import asyncio
+import functools
+import orjson
 import requests
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 import time
 
-@dataclass
+from .tavus_client import TavusAPIError, build_http_session
+
+# Gesture keywords for demo actions, checked in order: (keywords, gesture)
+_ACTION_GESTURES = (
+    (('click', 'button', 'press'), "point_at_screen"),
+    (('type', 'enter', 'input'), "typing_gesture"),
+    (('scroll', 'navigate'), "scroll_gesture"),
+    (('wait', 'pause'), "waiting_gesture"),
+    (('result', 'show', 'display'), "highlight_result"),
+)
+# Flattened to (keyword, gesture) pairs in the same order for a single scan
+_ACTION_KEYWORDS = tuple((word, gesture) for words, gesture in _ACTION_GESTURES for word in words)
+
+@functools.lru_cache(maxsize=512)
+def _gesture_for_action(action_description: str) -> str:
+    """Match gesture keywords as substrings, so "clicked" or "inputs" still count"""
+    action_lower = action_description.lower()
+    
+    for word, gesture in _ACTION_KEYWORDS:
+        if word in action_lower:
+            return gesture
+    
+    return "neutral_gesture"
+
+@functools.lru_cache(maxsize=1)
+def _iso_second(second: int) -> str:
+    """Format the generated_at stamp once per second instead of on every synthesis"""
+    return datetime.fromtimestamp(second).isoformat()
+
+@dataclass(slots=True)
 class AvatarSegment:
     """Represents a segment of avatar presentation with timing and actions"""
     start_time: float
@@ -23,7 +54,7 @@ class AvatarSegment:
     pause_for_demo: bool = False
     demo_completion_signal: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class DemoAction:
     """Represents a demo action that needs to be synchronized"""
     action_id: str
@@ -34,16 +65,82 @@ class DemoAction:
     completion_signal: str
     avatar_gesture: Optional[str] = None
 
+# The coordination script does not depend on the avatar script, so it is built once
+_COORDINATION_SCRIPT = "\n".join([
+    "# Demo Coordination Script",
+    "# Generated by Tavus Avatar Controller",
+    "",
+    "import time",
+    "import asyncio",
+    "from typing import Dict, Any",
+    "",
+    "class DemoCoordinator:",
+    "    def __init__(self):",
+    "        self.completion_signals = {}",
+    "        self.current_action = None",
+    "",
+    "    async def wait_for_avatar_segment(self, segment_id: str):",
+    "        \"\"\"Wait for avatar to complete segment\"\"\"",
+    "        # Implementation for waiting for avatar segment",
+    "        pass",
+    "",
+    "    async def execute_demo_action(self, action_id: str):",
+    "        \"\"\"Execute demo action and signal completion\"\"\"",
+    "        # Implementation for demo action execution",
+    "        pass",
+    "",
+    "    async def coordinate_presentation(self, avatar_script: Dict[str, Any]):",
+    "        \"\"\"Coordinate avatar presentation with demo actions\"\"\"",
+    "        coordination = avatar_script.get('demo_coordination', {})",
+    "",
+    "        for segment_id, demo_info in coordination.items():",
+    "            # Wait for avatar to reach demo segment",
+    "            await self.wait_for_avatar_segment(segment_id)",
+    "",
+    "            # Execute demo action",
+    "            action_id = demo_info['action_id']",
+    "            await self.execute_demo_action(action_id)",
+    "",
+    "            # Signal completion",
+    "            completion_signal = demo_info['completion_signal']",
+    "            self.completion_signals[completion_signal] = True",
+    "",
+    "            # Wait for avatar to continue",
+    "            await asyncio.sleep(1)",
+    "",
+    "# Usage:",
+    "# coordinator = DemoCoordinator()",
+    "# await coordinator.coordinate_presentation(avatar_script)"
+])
+
 class TavusAvatarController:
     """Controls Tavus avatar presentations with demo synchronization"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache_size: int = 0):
         self.api_key = api_key
         self.base_url = "https://api.tavus.com"
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
+        self._session = build_http_session(self.headers)
+        # Opt-in cache of synthesized presentations (cache_size entries, 0 disables),
+        # keyed on the canonical JSON of the presentation script and execution plan.
+        # Entries hold serialized data and segment field tuples, so a hit rebuilds
+        # fresh objects callers can mutate without touching the cache
+        self._synthesis_cache_size = cache_size
+        self._synthesis_cache: Dict[Tuple[bytes, bytes], Tuple[bytes, List[tuple]]] = {}
+        self.synthesis_cache_stats = {"hits": 0, "misses": 0}
+    
+    def __enter__(self) -> "TavusAvatarController":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        """Close pooled HTTP connections"""
+        self._session.close()
     
     def synthesize_avatar_script(
         self, 
@@ -61,6 +158,53 @@ class TavusAvatarController:
             Coordinated avatar presentation with timing and gestures
         """
         
+        if not self._synthesis_cache_size:
+            return self._synthesize_avatar_script(presentation_script, execution_plan)
+        
+        try:
+            key = (
+                orjson.dumps(presentation_script, option=orjson.OPT_SORT_KEYS),
+                orjson.dumps(execution_plan, option=orjson.OPT_SORT_KEYS)
+            )
+        except TypeError:
+            # Inputs that aren't plain JSON can't be keyed; synthesize them directly
+            return self._synthesize_avatar_script(presentation_script, execution_plan)
+        
+        entry = self._synthesis_cache.pop(key, None)
+        if entry is None:
+            self.synthesis_cache_stats["misses"] += 1
+            result = self._synthesize_avatar_script(presentation_script, execution_plan)
+            entry = (
+                orjson.dumps([result["avatar_script"], result["demo_coordination"], result["metadata"]]),
+                [
+                    (segment.start_time, segment.duration, segment.text, segment.gesture,
+                     segment.demo_action, segment.pause_for_demo, segment.demo_completion_signal)
+                    for segment in result["timeline"]
+                ]
+            )
+        else:
+            self.synthesis_cache_stats["hits"] += 1
+            avatar_script, demo_coordination, metadata = orjson.loads(entry[0])
+            metadata["generated_at"] = _iso_second(int(time.time()))
+            result = {
+                "avatar_script": avatar_script,
+                "timeline": [AvatarSegment(*fields) for fields in entry[1]],
+                "demo_coordination": demo_coordination,
+                "metadata": metadata
+            }
+        
+        self._synthesis_cache[key] = entry  # most recently used last
+        if len(self._synthesis_cache) > self._synthesis_cache_size:
+            del self._synthesis_cache[next(iter(self._synthesis_cache))]
+        return result
+    
+    def _synthesize_avatar_script(
+        self, 
+        presentation_script: Dict[str, Any], 
+        execution_plan: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build the coordinated presentation without consulting the cache"""
+        
         # Extract presentation sections
         sections = presentation_script.get('presentation_script', {}).get('sections', [])
         
@@ -68,7 +212,7 @@ class TavusAvatarController:
         demo_actions = self._extract_demo_actions(execution_plan)
         
         # Create coordinated timeline
-        timeline = self._create_coordinated_timeline(sections, demo_actions)
+        timeline, total_duration = self._create_coordinated_timeline(sections, demo_actions)
         
         # Generate avatar script with timing and gestures
         avatar_script = self._generate_avatar_script(timeline)
@@ -78,10 +222,10 @@ class TavusAvatarController:
             "timeline": timeline,
             "demo_coordination": self._create_demo_coordination(demo_actions),
             "metadata": {
-                "total_duration": self._calculate_total_duration(timeline),
+                "total_duration": total_duration,
                 "demo_actions_count": len(demo_actions),
                 "sections_count": len(sections),
-                "generated_at": datetime.now().isoformat()
+                "generated_at": _iso_second(int(time.time()))
             }
         }
     
@@ -108,30 +252,22 @@ class TavusAvatarController:
     
     def _suggest_gesture_for_action(self, action_description: str) -> str:
         """Suggest appropriate avatar gesture for demo action"""
-        action_lower = action_description.lower()
-        
-        if any(word in action_lower for word in ['click', 'button', 'press']):
-            return "point_at_screen"
-        elif any(word in action_lower for word in ['type', 'enter', 'input']):
-            return "typing_gesture"
-        elif any(word in action_lower for word in ['scroll', 'navigate']):
-            return "scroll_gesture"
-        elif any(word in action_lower for word in ['wait', 'pause']):
-            return "waiting_gesture"
-        elif any(word in action_lower for word in ['result', 'show', 'display']):
-            return "highlight_result"
-        else:
-            return "neutral_gesture"
+        # Automation plans repeat step phrasings, so lookups are memoized per string
+        return _gesture_for_action(action_description)
     
     def _create_coordinated_timeline(
         self, 
         sections: List[Dict], 
         demo_actions: List[DemoAction]
-    ) -> List[AvatarSegment]:
-        """Create coordinated timeline of avatar segments and demo actions"""
+    ) -> Tuple[List[AvatarSegment], float]:
+        """Create coordinated timeline of avatar segments and demo actions,
+        returned with the time at which the last segment ends"""
         
         timeline = []
         current_time = 0.0
+        # Tracked per segment rather than taken from current_time, since a demo
+        # section can leave part of its duration without segments
+        total_duration = 0.0
         
         for section in sections:
             section_duration = section.get('duration', 60)  # Default 60 seconds
@@ -148,6 +284,9 @@ class TavusAvatarController:
                     section_duration
                 )
                 timeline.extend(segments)
+                if segments:
+                    last_segment = segments[-1]
+                    total_duration = last_segment.start_time + last_segment.duration
             else:
                 # No demo steps, just presentation
                 segment = AvatarSegment(
@@ -157,10 +296,11 @@ class TavusAvatarController:
                     gesture="presentation_gesture"
                 )
                 timeline.append(segment)
+                total_duration = current_time + section_duration
             
             current_time += section_duration
         
-        return timeline
+        return timeline, total_duration
     
     def _split_section_with_demos(
         self, 
@@ -181,24 +321,24 @@ class TavusAvatarController:
         
         # Split content into parts
         content_parts = self._split_content_for_demos(content, len(demo_steps))
+        presentation_duration = presentation_time / len(content_parts)
+        action_count = len(demo_actions)
         
         for i, (content_part, demo_step) in enumerate(zip(content_parts, demo_steps)):
             # Presentation segment
             if content_part.strip():
-                presentation_duration = presentation_time / len(content_parts)
-                segment = AvatarSegment(
+                segments.append(AvatarSegment(
                     start_time=current_time,
                     duration=presentation_duration,
                     text=content_part,
                     gesture="presentation_gesture"
-                )
-                segments.append(segment)
+                ))
                 current_time += presentation_duration
             
             # Demo action segment
-            if i < len(demo_actions):
+            if i < action_count:
                 demo_action = demo_actions[i]
-                segment = AvatarSegment(
+                segments.append(AvatarSegment(
                     start_time=current_time,
                     duration=demo_time_per_step,
                     text=f"Now let me demonstrate: {demo_step}",
@@ -206,8 +346,7 @@ class TavusAvatarController:
                     demo_action=demo_action.action_id,
                     pause_for_demo=True,
                     demo_completion_signal=demo_action.completion_signal
-                )
-                segments.append(segment)
+                ))
                 current_time += demo_time_per_step
         
         return segments
@@ -226,52 +365,61 @@ class TavusAvatarController:
             part = '. '.join(sentences[i:i + sentences_per_part])
             if part.strip():
                 parts.append(part)
+                # Remainder sentences past the last part would be dropped anyway
+                if len(parts) > num_demos:
+                    break
         
         # Ensure we have enough parts
         while len(parts) < num_demos + 1:
             parts.append("")
         
-        return parts[:num_demos + 1]
+        return parts
     
     def _generate_avatar_script(self, timeline: List[AvatarSegment]) -> Dict[str, Any]:
         """Generate Tavus avatar script with timing and gestures"""
         
+        presentation_segments = []
+        gestures = {}
+        demo_coordination = {}
         avatar_script = {
             "presentation": {
                 "title": "AI-Powered Demo Presentation",
-                "segments": []
+                "segments": presentation_segments
             },
-            "gestures": {},
+            "gestures": gestures,
             "timing": {},
-            "demo_coordination": {}
+            "demo_coordination": demo_coordination
         }
         
-        for i, segment in enumerate(timeline):
-            segment_id = f"segment_{i+1}"
+        for i, segment in enumerate(timeline, 1):
+            segment_id = f"segment_{i}"
+            start_time = segment.start_time
+            duration = segment.duration
+            gesture = segment.gesture
             
             # Add presentation segment
-            avatar_script["presentation"]["segments"].append({
+            presentation_segments.append({
                 "id": segment_id,
                 "text": segment.text,
-                "duration": segment.duration,
-                "start_time": segment.start_time
+                "duration": duration,
+                "start_time": start_time
             })
             
             # Add gesture if specified
-            if segment.gesture:
-                avatar_script["gestures"][segment_id] = {
-                    "type": segment.gesture,
-                    "start_time": segment.start_time,
-                    "duration": segment.duration
+            if gesture:
+                gestures[segment_id] = {
+                    "type": gesture,
+                    "start_time": start_time,
+                    "duration": duration
                 }
             
             # Add demo coordination if needed
             if segment.pause_for_demo:
-                avatar_script["demo_coordination"][segment_id] = {
+                demo_coordination[segment_id] = {
                     "action_id": segment.demo_action,
                     "completion_signal": segment.demo_completion_signal,
-                    "pause_duration": segment.duration,
-                    "gesture": segment.gesture
+                    "pause_duration": duration,
+                    "gesture": gesture
                 }
         
         return avatar_script
@@ -279,77 +427,74 @@ class TavusAvatarController:
     def _create_demo_coordination(self, demo_actions: List[DemoAction]) -> Dict[str, Any]:
         """Create demo coordination instructions"""
         
+        demo_action_entries = []
+        signals = {}
         coordination = {
-            "demo_actions": [],
-            "signals": {},
+            "demo_actions": demo_action_entries,
+            "signals": signals,
             "timing": {}
         }
         
         for action in demo_actions:
-            coordination["demo_actions"].append({
-                "id": action.action_id,
-                "description": action.description,
+            action_id = action.action_id
+            description = action.description
+            completion_signal = action.completion_signal
+            
+            demo_action_entries.append({
+                "id": action_id,
+                "description": description,
                 "expected_duration": action.expected_duration,
                 "ui_selectors": action.ui_selectors,
                 "expected_outcome": action.expected_outcome,
-                "completion_signal": action.completion_signal
+                "completion_signal": completion_signal
             })
             
-            coordination["signals"][action.completion_signal] = {
-                "action_id": action.action_id,
-                "description": f"Signal when {action.description} is complete"
+            signals[completion_signal] = {
+                "action_id": action_id,
+                "description": f"Signal when {description} is complete"
             }
         
         return coordination
     
-    def _calculate_total_duration(self, timeline: List[AvatarSegment]) -> float:
-        """Calculate total presentation duration"""
-        if not timeline:
-            return 0.0
-        
-        last_segment = timeline[-1]
-        return last_segment.start_time + last_segment.duration
-    
     async def create_avatar_presentation(self, avatar_script: Dict[str, Any]) -> str:
-        """Create Tavus avatar presentation"""
+        """Create Tavus avatar presentation
         
-        try:
-            # Prepare presentation data for Tavus API
-            presentation_data = {
-                "script": avatar_script["presentation"],
-                "gestures": avatar_script["gestures"],
-                "timing": avatar_script["timing"],
-                "metadata": {
-                    "title": "AI-Powered Demo Presentation",
-                    "description": "Synchronized avatar presentation with demo automation",
-                    "duration": avatar_script.get("metadata", {}).get("total_duration", 300)
-                }
+        Raises TavusAPIError when the request fails or Tavus rejects it, so callers
+        don't go on to start a presentation that was never created.
+        """
+        
+        # Prepare presentation data for Tavus API
+        presentation_data = {
+            "script": avatar_script["presentation"],
+            "gestures": avatar_script["gestures"],
+            "timing": avatar_script["timing"],
+            "metadata": {
+                "title": "AI-Powered Demo Presentation",
+                "description": "Synchronized avatar presentation with demo automation",
+                "duration": avatar_script.get("metadata", {}).get("total_duration", 300)
             }
-            
-            # Call Tavus API to create presentation
-            response = requests.post(
+        }
+        
+        # Call Tavus API to create presentation
+        try:
+            response = self._session.post(
                 f"{self.base_url}/v1/presentations",
-                headers=self.headers,
                 json=presentation_data
             )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result.get("presentation_id", "unknown")
-            else:
-                raise Exception(f"Tavus API error: {response.status_code} - {response.text}")
-                
-        except Exception as e:
-            print(f"Error creating avatar presentation: {e}")
-            return "demo_presentation_id"
+            response.raise_for_status()
+        except requests.exceptions.HTTPError as e:
+            raise TavusAPIError(f"Tavus API error: {response.status_code} - {response.text}") from e
+        except requests.exceptions.RequestException as e:
+            raise TavusAPIError(f"Failed to reach Tavus API: {e}") from e
+        
+        return response.json().get("presentation_id", "unknown")
     
     async def start_presentation(self, presentation_id: str) -> bool:
         """Start the avatar presentation"""
         
         try:
-            response = requests.post(
-                f"{self.base_url}/v1/presentations/{presentation_id}/start",
-                headers=self.headers
+            response = self._session.post(
+                f"{self.base_url}/v1/presentations/{presentation_id}/start"
             )
             
             return response.status_code == 200
@@ -361,56 +506,7 @@ class TavusAvatarController:
     def generate_coordination_script(self, avatar_script: Dict[str, Any]) -> str:
         """Generate coordination script for demo automation"""
         
-        coordination = avatar_script.get("demo_coordination", {})
-        
-        script_lines = [
-            "# Demo Coordination Script",
-            "# Generated by Tavus Avatar Controller",
-            "",
-            "import time",
-            "import asyncio",
-            "from typing import Dict, Any",
-            "",
-            "class DemoCoordinator:",
-            "    def __init__(self):",
-            "        self.completion_signals = {}",
-            "        self.current_action = None",
-            "",
-            "    async def wait_for_avatar_segment(self, segment_id: str):",
-            "        \"\"\"Wait for avatar to complete segment\"\"\"",
-            "        # Implementation for waiting for avatar segment",
-            "        pass",
-            "",
-            "    async def execute_demo_action(self, action_id: str):",
-            "        \"\"\"Execute demo action and signal completion\"\"\"",
-            "        # Implementation for demo action execution",
-            "        pass",
-            "",
-            "    async def coordinate_presentation(self, avatar_script: Dict[str, Any]):",
-            "        \"\"\"Coordinate avatar presentation with demo actions\"\"\"",
-            "        coordination = avatar_script.get('demo_coordination', {})",
-            "",
-            "        for segment_id, demo_info in coordination.items():",
-            "            # Wait for avatar to reach demo segment",
-            "            await self.wait_for_avatar_segment(segment_id)",
-            "",
-            "            # Execute demo action",
-            "            action_id = demo_info['action_id']",
-            "            await self.execute_demo_action(action_id)",
-            "",
-            "            # Signal completion",
-            "            completion_signal = demo_info['completion_signal']",
-            "            self.completion_signals[completion_signal] = True",
-            "",
-            "            # Wait for avatar to continue",
-            "            await asyncio.sleep(1)",
-            "",
-            "# Usage:",
-            "# coordinator = DemoCoordinator()",
-            "# await coordinator.coordinate_presentation(avatar_script)"
-        ]
-        
-        return "\n".join(script_lines)
+        return _COORDINATION_SCRIPT
 
 # Example usage
 if __name__ == "__main__":
@@ -4,15 +4,47 @@ Tavus Client - Real integration with Tavus API for avatar creation and control
 """
 
 import os
-import json
+import asyncio
+import logging
+import orjson
 import requests
 import time
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Retried statuses are the transient ones Tavus returns under load; urllib3
+# only retries idempotent methods by default, so video creation is never sent twice
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+class TavusAPIError(RuntimeError):
+    """Raised when a Tavus API request fails or is rejected"""
+
+def build_http_session(headers: Dict[str, str]) -> requests.Session:
+    """Create a pooled session that keeps Tavus connections alive across calls"""
+    session = requests.Session()
+    session.headers.update(headers)
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=_RETRY_STATUSES)
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+# Polling backoff: starts near 3s so short videos are picked up quickly, capped at 30s
+_POLL_MAX_DELAY = 30.0
+
+def _poll_delay(attempt: int) -> float:
+    return min(_POLL_MAX_DELAY, 2 + 1.5 ** attempt)
+
 @dataclass
 class TavusConfig:
     """Configuration for Tavus API"""
@@ -52,6 +84,21 @@ class TavusClient:
             "x-api-key": self.config.api_key,  # Correct header format from docs
             "Content-Type": "application/json"
         }
+        # The session sends only the API key, as GETs need; POSTs pass self.headers
+        # because requests leaves orjson-encoded data= bodies without a Content-Type
+        self._session = build_http_session({"x-api-key": self.config.api_key})
+        # Last (ETag, status) per video, so unchanged polls can be answered with 304
+        self._status_cache: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+    
+    def __enter__(self) -> "TavusClient":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        """Close pooled HTTP connections"""
+        self._session.close()
     
     def create_video(self, request: VideoRequest) -> VideoResponse:
         """Create a new video with the given script"""
@@ -69,7 +116,7 @@ class TavusClient:
             print(f"📝 Truncated script to {len(words)} words (~1 minute)")
         
         print("🎭 Creating Tavus video...")
-        print(f"🔗 API URL: {self.config.base_url}/v2/videos")
+        logger.debug("API URL: %s/v2/videos", self.config.base_url)
         
         # Hardcode a valid replica_id
         hardcoded_replica_id = "re1074c227"  # Replace with your preferred valid replica_id
@@ -84,24 +131,26 @@ class TavusClient:
         
         try:
             print(f"📤 Sending request to Tavus API...")
-            print(f"📋 Payload: {json.dumps(payload, indent=2)}")
+            # The payload carries the whole script; only serialize it when debugging
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Payload: %s", orjson.dumps(payload).decode())
             
             # Make API call to create video using correct endpoint from docs
-            response = requests.post(
+            response = self._session.post(
                 f"{self.config.base_url}/v2/videos",
+                data=orjson.dumps(payload),
                 headers=self.headers,
-                json=payload,
                 timeout=self.config.timeout
             )
             
             print(f"📥 Response status: {response.status_code}")
-            print(f"📥 Response headers: {dict(response.headers)}")
+            logger.debug("Response headers: %s", response.headers)
             
             if response.status_code != 200:
                 print(f"📥 Response body: {response.text}")
             
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             
             print(f"✅ Video created: {data.get('video_id', 'Unknown')}")
             
@@ -122,7 +171,7 @@ class TavusClient:
             print(f"❌ Timeout error: {str(e)}")
             raise Exception(f"Tavus API request timed out: {str(e)}")
             
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             print(f"❌ Tavus API error: {str(e)}")
             print(f"💡 Please verify your TAVUS_API_KEY and check Tavus documentation")
             raise Exception(f"Failed to create Tavus video: {str(e)}")
@@ -130,28 +179,42 @@ class TavusClient:
     def get_video_status(self, video_id: str) -> Dict[str, Any]:
         """Get the status of a video using correct endpoint from docs"""
         
+        cached = self._status_cache.get(video_id)
+        
         try:
-            response = requests.get(
+            response = self._session.get(
                 f"{self.config.base_url}/v2/videos/{video_id}",
-                headers={"x-api-key": self.config.api_key},  # Only x-api-key header for GET
+                headers={"If-None-Match": cached[0]} if cached else None,
                 timeout=self.config.timeout
             )
             
+            if response.status_code == 304 and cached:
+                return dict(cached[1])
+            
             response.raise_for_status()
-            return response.json()
+            status_data = orjson.loads(response.content)
+            
+            etag = response.headers.get("ETag")
+            if etag:
+                self._status_cache[video_id] = (etag, dict(status_data))
+            else:
+                self._status_cache.pop(video_id, None)
+            return status_data
             
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             print(f"❌ Error getting video status: {str(e)}")
             return {"status": "error", "error": str(e)}
     
-    def wait_for_completion(self, video_id: str, max_wait: int = 300) -> bool:
-        """Wait for video to complete processing"""
+    async def wait_for_completion(self, video_id: str, max_wait: int = 300) -> bool:
+        """Wait for video to complete processing without blocking the event loop"""
         
         print(f"⏳ Waiting for video to complete...")
         
-        start_time = time.time()
-        while time.time() - start_time < max_wait:
-            status_data = self.get_video_status(video_id)
+        deadline = time.monotonic() + max_wait
+        attempt = 0
+        while True:
+            # Status requests reuse the pooled session in a worker thread
+            status_data = await asyncio.to_thread(self.get_video_status, video_id)
             status = status_data.get('status', 'unknown')
             
             if status == 'ready':
@@ -162,10 +225,14 @@ class TavusClient:
                 return False
             elif status in ['queued', 'generating']:
                 print(f"⏳ Still processing... ({status})")
-                time.sleep(10)  # Wait 10 seconds before checking again
             else:
                 print(f"⚠️ Unknown status: {status}")
-                time.sleep(10)
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(_poll_delay(attempt), remaining))
+            attempt += 1
         
         print("⏰ Timeout waiting for video completion")
         return False
@@ -216,8 +283,8 @@ class TavusClient:
         - Ensure clear pronunciation of technical terms
         """
     
-    def create_presentation_from_script(self, script: str, audience: str = "Mixed", purpose: str = "Demo") -> Dict[str, Any]:
-        """Create a complete presentation from the generated script"""
+    async def submit(self, script: str, audience: str = "Mixed", purpose: str = "Demo") -> str:
+        """Start rendering a video for the script and return its video id"""
         
         # Customize instructions based on audience and purpose
         custom_instructions = f"""
@@ -237,28 +304,62 @@ class TavusClient:
         )
         
         # Create the video
-        response = self.create_video(request)
+        response = await asyncio.to_thread(self.create_video, request)
+        return response.video_id
+    
+    async def await_ready(self, video_id: str) -> Dict[str, Any]:
+        """Wait for a submitted video and describe the finished presentation"""
         
         # Wait for completion
-        if self.wait_for_completion(response.video_id):
+        if await self.wait_for_completion(video_id):
             # Get final status
-            final_status = self.get_video_status(response.video_id)
+            final_status = await asyncio.to_thread(self.get_video_status, video_id)
             
             # Get the hosted URL from the final status
             hosted_url = final_status.get('hosted_url')
             
             return {
-                "presentation_id": response.video_id,
+                "presentation_id": video_id,
                 "status": "completed",
                 "embed_url": hosted_url,
                 "preview_url": hosted_url,
                 "duration": None,  # Duration not provided by Tavus API
-                "embed_code": self.generate_embed_code(response.video_id, hosted_url),
+                "embed_code": self.generate_embed_code(video_id, hosted_url),
                 "final_status": final_status
             }
         else:
             return {
-                "presentation_id": response.video_id,
+                "presentation_id": video_id,
                 "status": "failed",
                 "error": "Video processing failed or timed out"
-            } 
\ No newline at end of file
+            }
+    
+    async def create_presentation_from_script(self, script: str, audience: str = "Mixed", purpose: str = "Demo") -> Dict[str, Any]:
+        """Create a complete presentation from the generated script"""
+        
+        video_id = await self.submit(script, audience, purpose)
+        return await self.await_ready(video_id)
+    
+    async def create_many(
+        self,
+        scripts: List[str],
+        audience: str = "Mixed",
+        purpose: str = "Demo",
+        max_concurrency: int = 4
+    ) -> List[Dict[str, Any]]:
+        """Create several presentations, returning results in script order
+        
+        Tavus renders videos independently, so every script is submitted before
+        any polling starts; max_concurrency bounds simultaneous create requests.
+        Polling holds no slot since it mostly sleeps, and holding one would eat
+        into max_wait for videos queued behind it.
+        """
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def submit(script: str) -> str:
+            async with semaphore:
+                return await self.submit(script, audience, purpose)
+        
+        video_ids = await asyncio.gather(*(submit(script) for script in scripts))
+        return await asyncio.gather(*(self.await_ready(video_id) for video_id in video_ids))
@@ -4,8 +4,8 @@ Unified Processor - Combines all inputs and generates demo content
 """
 
 import os
-import json
 import asyncio
+import orjson
 from typing import Dict, Any, Optional, List
 from pathlib import Path
 
@@ -16,6 +16,9 @@ from .llama_client import LlamaClient, LlamaConfig
 from .tavus_client import TavusClient
 from config import SYSTEM_PROMPT
 
+# Result files: indented for reading, with any non-string dict keys stringified
+_JSON_FILE_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
 class UnifiedProcessor:
     """Unified processor that combines all inputs and generates demo content"""
     
@@ -50,8 +53,11 @@ class UnifiedProcessor:
         
         print("🚀 Starting unified demo processing...")
         
-        # Step 1: Parse requirements document
-        requirements_data = self._parse_requirements(requirements_file, requirements_path)
+        # Step 1: Parse requirements document (CPU-bound, so keep it off the event loop;
+        # large PDFs are further split across the parser's process pool)
+        requirements_data = await asyncio.to_thread(
+            self._parse_requirements, requirements_file, requirements_path
+        )
         
         # Step 2: Analyze GitHub repository
         github_data = self._analyze_github(github_url)
@@ -67,7 +73,7 @@ class UnifiedProcessor:
         )
         
         # Step 5: Generate avatar script
-        avatar_script = self._generate_avatar_script(
+        avatar_script = await self._generate_avatar_script(
             presentation_script, demo_plan, audience, purpose
         )
         
@@ -121,8 +127,8 @@ class UnifiedProcessor:
                     'title': req.title,
                     'description': req.description,
                     'priority': req.priority,
-                    'features': req.features,
-                    'acceptance_criteria': req.acceptance_criteria,
+                    'features': list(req.features),
+                    'acceptance_criteria': list(req.acceptance_criteria),
                     'technical_notes': req.technical_notes,
                     'page_number': req.page_number
                 }
@@ -204,7 +210,7 @@ class UnifiedProcessor:
         
         # Convert to string if it's a dict
         if isinstance(script_result, dict):
-            script = json.dumps(script_result, indent=2)
+            script = orjson.dumps(script_result, option=orjson.OPT_INDENT_2).decode()
         else:
             script = str(script_result)
         
@@ -265,7 +271,7 @@ class UnifiedProcessor:
         print(f"📋 Generated {len(demo_steps)} demo steps")
         return demo_plan
     
-    def _generate_avatar_script(
+    async def _generate_avatar_script(
         self,
         presentation_script: str,
         demo_plan: Dict[str, Any],
@@ -280,13 +286,13 @@ class UnifiedProcessor:
             # Convert presentation script to plain text if it's JSON
             if isinstance(presentation_script, str) and presentation_script.strip().startswith('{'):
                 # Parse JSON and extract text content
-                script_data = json.loads(presentation_script)
+                script_data = orjson.loads(presentation_script)
                 script_text = self._extract_text_from_script(script_data)
             else:
                 script_text = presentation_script
             
             # Create avatar presentation using Tavus API
-            avatar_result = self.tavus_client.create_presentation_from_script(
+            avatar_result = await self.tavus_client.create_presentation_from_script(
                 script=script_text,
                 audience=audience,
                 purpose=purpose
@@ -412,16 +418,16 @@ class UnifiedProcessor:
             f.write(results["presentation_script"])
         
         # Save demo plan
-        with open(f"{output_dir}/demo_plan.json", "w") as f:
-            json.dump(results["demo_plan"], f, indent=2)
+        with open(f"{output_dir}/demo_plan.json", "wb") as f:
+            f.write(orjson.dumps(results["demo_plan"], option=_JSON_FILE_OPTIONS))
         
         # Save avatar script
-        with open(f"{output_dir}/avatar_script.json", "w") as f:
-            json.dump(results["avatar_script"], f, indent=2)
+        with open(f"{output_dir}/avatar_script.json", "wb") as f:
+            f.write(orjson.dumps(results["avatar_script"], option=_JSON_FILE_OPTIONS))
         
         # Save complete results
-        with open(f"{output_dir}/complete_results.json", "w") as f:
-            json.dump(results, f, indent=2)
+        with open(f"{output_dir}/complete_results.json", "wb") as f:
+            f.write(orjson.dumps(results, option=_JSON_FILE_OPTIONS))
         
         print(f"💾 Results saved to {output_dir}/")
 
@@ -5,6 +5,7 @@ Test Demo Integration - Validates complete avatar + browser automation flow
 
 import asyncio
 import json
+import logging
 import os
 import sys
 from pathlib import Path
@@ -17,6 +18,8 @@ from core.demo_orchestrator import DemoOrchestrator
 from core.browser_agent import BrowserAgent
 from core.tavus_avatar_controller import TavusAvatarController
 
+logging.basicConfig(level=logging.INFO)
+
 async def test_complete_integration():
     """Test the complete integration flow"""
     